@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+"""Measure how fast the console parses and dispatches commands
+
+Each command form used in tests/test_console.py is timed through
+parse() as it was before, through the current parse() on new lines and
+on lines it has seen, and through onecmd() inside a batch.
+
+Usage: ./benchmarks/bench_console.py [commands]
+"""
+import io
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from shlex import split
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import console  # noqa: E402
+from console import HBNBCommand  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def old_parse(arg):
+    """Split command arguments the way the console used to"""
+    x = re.search(r"\{(.*?)\}", arg)
+    b = re.search(r"\[(.*?)\]", arg)
+    if x is None:
+        if b is None:
+            return [i.strip(",") for i in split(arg)]
+        y = [i.strip(",") for i in split(arg[:b.span()[0]])]
+        y.append(b.group())
+        return y
+    y = [i.strip(",") for i in split(arg[:x.span()[0]])]
+    y.append(x.group())
+    return y
+
+
+def forms(ids):
+    """Get one line of each command form for each id in ids"""
+    return {
+        "create": ["create Place" for id in ids],
+        "show": ["show Place " + id for id in ids],
+        "Class.show()": ["Place.show({})".format(id) for id in ids],
+        "Class.count()": ["Place.count()" for id in ids],
+        "update": ['update Place {} name "My place"'.format(id)
+                   for id in ids],
+        "Class.update()": ['Place.update({}, max_guest, 4)'.format(id)
+                           for id in ids],
+        "update dict": ['Place.update({}, {{"max_guest": 4}})'.format(id)
+                        for id in ids],
+    }
+
+
+def rate(fn, lines):
+    """Get the lines per second fn handles"""
+    st = time.perf_counter()
+    for ln in lines:
+        fn(ln)
+    return len(lines) / (time.perf_counter() - st)
+
+
+def args(ln):
+    """Get the argument part of a console line"""
+    sh = console._shape(ln)
+    return ln.partition(" ")[2] if sh is None else "{} {}".format(*sh[1:4:2])
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    dr = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(dr, "file.json")
+    try:
+        ids = [Place().id for ix in range(n)]
+        cmd = HBNBCommand()
+        print("{:15} {:>12} {:>12} {:>12} {:>12}".format(
+            "lines/s", "old parse", "new parse", "cached", "onecmd"))
+        for name, lines in forms(ids).items():
+            fields = [args(ln) for ln in lines]
+            old = rate(old_parse, fields)
+            console._parse.cache_clear()
+            new = rate(console.parse, fields)
+            cached = rate(console.parse, fields[-4000:] * (n // 4000 + 1))
+            console._shape.cache_clear()
+            with patch("sys.stdout", new=io.StringIO()), storage.batch():
+                full = rate(cmd.onecmd, lines)
+            print("{:15} {:12.0f} {:12.0f} {:12.0f} {:12.0f}".format(
+                name, old, new, cached, full))
+    finally:
+        FileStorage._FileStorage__objects = {}
+        shutil.rmtree(dr)
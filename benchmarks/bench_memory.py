@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+"""Measure the memory taken by objects loaded from file.json
+
+The text cache is turned off, so that only the objects are counted.
+
+Usage: ./benchmarks/bench_memory.py [objects]
+"""
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def bench(pt, compact):
+    """Get the bytes held per object after reloading pt"""
+    FileStorage._FileStorage__objects = {}
+    fs = FileStorage(pt, compact=compact, cache=False)
+    gc.collect()
+    tracemalloc.start()
+    fs.reload()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    n = fs.count()
+    FileStorage._FileStorage__objects = {}
+    return size / n
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    dr = tempfile.mkdtemp()
+    try:
+        pt = os.path.join(dr, "file.json")
+        for ix in range(n):
+            pl = Place()
+            pl.name = "place {}".format(ix)
+            pl.city_id = "0c5f6a0b-4a3e-4e8f-9e4e-6b1b8f6a{:04d}".format(
+                ix % 10000)
+            pl.number_rooms = ix % 7
+            pl.price_by_night = 100 + ix % 50
+        FileStorage(pt).save()
+        base = bench(pt, False)
+        small = bench(pt, True)
+        print("dict    {:7.1f} bytes/object".format(base))
+        print("compact {:7.1f} bytes/object  {:+6.1f}%".format(
+            small, (small / base - 1) * 100))
+    finally:
+        FileStorage._FileStorage__objects = {}
+        shutil.rmtree(dr)
@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""Measure how fast FileStorage reloads file.json
+
+The reload is timed with the strptime() call BaseModel used before,
+with the current timestamp parser, and in worker processes.
+
+Usage: ./benchmarks/bench_reload.py [objects] [workers]
+"""
+from datetime import datetime
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def strptime(tx):
+    """Parse a timestamp the way BaseModel used to"""
+    return datetime.strptime(tx, "%Y-%m-%dT%H:%M:%S.%f" if "." in tx else
+                             "%Y-%m-%dT%H:%M:%S")
+
+
+def bench(pt, workers=0):
+    """Get the objects reloaded per second from pt"""
+    FileStorage._FileStorage__objects = {}
+    fs = FileStorage(pt, workers=workers)
+    st = time.perf_counter()
+    fs.reload()
+    tm = time.perf_counter() - st
+    n = fs.count()
+    FileStorage._FileStorage__objects = {}
+    return n / tm
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    dr = tempfile.mkdtemp()
+    try:
+        pt = os.path.join(dr, "file.json")
+        for ix in range(n):
+            Place().name = "place {}".format(ix)
+        FileStorage(pt).save()
+        with patch("models.base_model._parse_time", strptime):
+            old = bench(pt)
+        new = bench(pt)
+        par = bench(pt, workers)
+        print("strptime    {:10.0f} objects/s".format(old))
+        print("fromisoformat {:8.0f} objects/s  {:+6.1f}%".format(
+            new, (new / old - 1) * 100))
+        print("{:2} workers  {:10.0f} objects/s  {:+6.1f}%".format(
+            workers, par, (par / old - 1) * 100))
+    finally:
+        FileStorage._FileStorage__objects = {}
+        shutil.rmtree(dr)
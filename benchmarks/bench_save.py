@@ -0,0 +1,44 @@
+#!/usr/bin/python3
+"""Measure the cost of saving FileStorage under each fsync policy
+
+Usage: ./benchmarks/bench_save.py [objects] [saves]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+def bench(policy, n, saves):
+    """Time saves of n objects, one object changed before each save"""
+    FileStorage._FileStorage__objects = {}
+    dr = tempfile.mkdtemp()
+    try:
+        fs = FileStorage(os.path.join(dr, "file.json"), fsync=policy)
+        obs = [Place() for ix in range(n)]
+        fs.save()
+        st = time.perf_counter()
+        for ix in range(saves):
+            obs[ix % n].name = "place {}".format(ix)
+            fs.save()
+        return (time.perf_counter() - st) / saves
+    finally:
+        FileStorage._FileStorage__objects = {}
+        shutil.rmtree(dr)
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    saves = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    base = None
+    for policy in ("none", "file", "dir"):
+        tm = bench(policy, n, saves)
+        base = tm if base is None else base
+        print("{:5} {:8.2f} ms/save  {:+6.1f}%".format(
+            policy, tm * 1000, (tm / base - 1) * 100))
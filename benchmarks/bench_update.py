@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""Measure the update throughput of the console
+
+Updates are timed through the eval() based do_update the console used
+before and through the current one, inside a batch so that saving does
+not count, taking the best of three runs.
+
+Usage: ./benchmarks/bench_update.py [updates]
+"""
+import gc
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from console import HBNBCommand, parse  # noqa: E402
+from models import storage  # noqa: E402
+from models.engine.file_storage import FileStorage  # noqa: E402
+from models.place import Place  # noqa: E402
+
+
+class OldCommand(HBNBCommand):
+    """The console with the do_update it had before"""
+
+    def do_update(self, arg):
+        """Update an instance, evaluating the value like before"""
+        h = parse(arg)
+        ob = storage.get(h[0], h[1])
+        if len(h) == 3:
+            try:
+                type(eval(h[2])) != dict
+            except NameError:
+                print("** value missing **")
+                return False
+        cl = storage.classes()[h[0]]
+        if len(h) == 4:
+            if h[2] in cl.__dict__.keys():
+                vp = type(cl.__dict__[h[2]])
+                setattr(ob, h[2], vp(h[3]))
+            else:
+                setattr(ob, h[2], h[3])
+        elif type(eval(h[2])) == dict:
+            for n, b in eval(h[2]).items():
+                if (n in cl.__dict__.keys() and
+                        type(cl.__dict__[n]) in {str, int, float}):
+                    vp = type(cl.__dict__[n])
+                    setattr(ob, n, vp(b))
+                else:
+                    setattr(ob, n, b)
+        storage.new(ob)
+        storage.save()
+
+
+def rate(cmd, lines, runs=3):
+    """Get the lines per second cmd runs, best of runs"""
+    best = 0
+    for ix in range(runs):
+        gc.collect()
+        with patch("sys.stdout", new=io.StringIO()), storage.batch():
+            st = time.perf_counter()
+            for ln in lines:
+                cmd.onecmd(ln)
+            best = max(best, len(lines) / (time.perf_counter() - st))
+    return best
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    dr = tempfile.mkdtemp()
+    FileStorage._FileStorage__file_path = os.path.join(dr, "file.json")
+    try:
+        ids = [Place().id for ix in range(n)]
+        forms = {
+            "attribute": ["update Place {} max_guest {}".format(id, ix)
+                          for ix, id in enumerate(ids)],
+            "dictionary": ['Place.update({}, {{"max_guest": {}, '
+                           '"name": "place"}})'.format(id, ix)
+                           for ix, id in enumerate(ids)],
+        }
+        for name, lines in forms.items():
+            old = rate(OldCommand(), lines)
+            new = rate(HBNBCommand(), lines)
+            print("{:10} eval {:8.0f} updates/s  literal {:8.0f} updates/s"
+                  "  {:+6.1f}%".format(name, old, new, (new / old - 1) * 100))
+    finally:
+        FileStorage._FileStorage__objects = {}
+        shutil.rmtree(dr)
@@ -1,34 +1,144 @@
 #!/usr/bin/python3
 """Defines the HBnB conso."""
+import ast
 import cmd
+import datetime
+from functools import lru_cache
+from itertools import islice
+import json
 import re
 from shlex import split
+import sys
+import time
 from models import storage
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.place import Place
-from models.amenity import Amenity
-from models.review import Review
+from models.base_model import _parse_time
+from models.engine import bulk
 
 
-def parse(arg):
-    x = re.search(r"\{(.*?)\}", arg)
-    b = re.search(r"\[(.*?)\]", arg)
+_braces = re.compile(r"\{(.*?)\}")
+_brackets = re.compile(r"\[(.*?)\]")
+_quoted = re.compile(r"[\"'\\]|[^\S \t\r\n]")
+_call = re.compile(r"([^.]*)\.([^(]*)\((.*?)\)")
+_args = r"(?:\"[^\"]*\"|'[^']*'|[^()\"'])*"
+_query = re.compile(r"(\w+)((?:\.(?:where|order_by|limit|offset|after)"
+                    r"\(" + _args + r"\))+)")
+_query_call = re.compile(r"\.(\w+)\((" + _args + r")\)")
+_query_arg = re.compile(r"(?:\"[^\"]*\"|'[^']*'|[^,\"'])+")
+
+
+def _split(arg):
+    """Split arg like shlex, without shlex when nothing is quoted"""
+    if _quoted.search(arg) is None:
+        return tuple(i.strip(",") for i in arg.split())
+    return tuple(i.strip(",") for i in split(arg))
+
+
+@lru_cache(maxsize=4096)
+def _parse(arg):
+    """Split the arguments of a command, keeping a {dictionary} or else
+    a [list] as the last one"""
+    x = _braces.search(arg) or _brackets.search(arg)
     if x is None:
-        if b is None:
-            return [i.strip(",") for i in split(arg)]
+        return _split(arg)
+    return _split(arg[:x.start()]) + (x.group(),)
+
+
+def parse(arg):
+    return list(_parse(arg))
+
+
+@lru_cache(maxsize=4096)
+def _shape(arg):
+    """Get what a <class>.<command>(<args>) line asks for: ("query",
+    class, calls), ("call", class, command, args) or None"""
+    m = _query.fullmatch(arg)
+    if m is not None:
+        return "query", m.group(1), m.group(2)
+    m = _call.match(arg)
+    if m is not None:
+        return ("call",) + m.groups()
+    return None
+
+
+def value(tx):
+    """Get the number, or the string without quotes, written as tx"""
+    for tp in (int, float):
+        try:
+            return tp(tx)
+        except ValueError:
+            pass
+    if len(tx) > 1 and tx[0] == tx[-1] and tx[0] in "\"'":
+        return tx[1:-1]
+    return tx
+
+
+@lru_cache(maxsize=None)
+def _schema(name):
+    """Get the attributes and their types for class name, once"""
+    return bulk.schema(storage, name)
+
+
+def literal(tx):
+    """Get the Python literal written as tx, or raise ValueError
+
+    JSON is tried first as it parses faster.
+    """
+    try:
+        return json.loads(tx)
+    except ValueError:
+        pass
+    try:
+        return ast.literal_eval(tx)
+    except (SyntaxError, TypeError, MemoryError, RecursionError) as ee:
+        raise ValueError(str(ee)) from ee
+
+
+def typed(tp, v):
+    """Convert the value v to the type tp from storage.attributes()
+
+    Strings are converted to numbers, parsed as lists or dictionaries,
+    or read as timestamps, and numbers are converted to strings or
+    other numbers.  Any other value raises TypeError or ValueError, as
+    does a value without a type that does not come back the same from
+    JSON, like bytes, sets or tuples.
+    """
+    if tp is datetime.datetime:
+        return v if type(v) is tp else _parse_time(v)
+    if tp in (list, dict) and type(v) is str:
+        v = literal(v)
+    if tp is None or tp in (list, dict):
+        if tp is not None and type(v) is not tp:
+            raise ValueError("{!r} is not a {}".format(v, tp.__name__))
+        if json.loads(json.dumps(v)) != v:
+            raise ValueError("{!r} cannot be stored".format(v))
+        return v
+    if type(v) not in (str, int, float):
+        raise ValueError("{!r} is not a {}".format(v, tp.__name__))
+    return tp(v)
+
+
+def query(name, calls):
+    """Build the storage query for class name from the chained calls
+    text, like .where(price_by_night<100, city_id="c1").limit(20)"""
+    qr = storage.query(name)
+    for md, args in _query_call.findall(calls):
+        args = [a.strip() for a in _query_arg.findall(args) if a.strip()]
+        if md == "where":
+            for a in args:
+                m = re.fullmatch(r"(\w+)\s*(<=|>=|!=|==|=|<|>)\s*(.*)", a)
+                if m is None:
+                    raise ValueError("bad condition: " + a)
+                op = "==" if m.group(2) == "=" else m.group(2)
+                qr = qr.where(m.group(1), op, value(m.group(3)))
+        elif md == "order_by":
+            qr = qr.order_by(*args)
+        elif md in ("limit", "offset") and len(args) == 1:
+            qr = getattr(qr, md)(int(args[0]))
+        elif md == "after" and len(args) == 1:
+            qr = qr.after(value(args[0]))
         else:
-            li = split(arg[:b.span()[0]])
-            y = [i.strip(",") for i in li]
-            y.append(b.group())
-            return y
-    else:
-        li = split(arg[:x.span()[0]])
-        y = [i.strip(",") for i in li]
-        y.append(x.group())
-        return y
+            raise ValueError("bad query call: " + md)
+    return qr
 
 
 class HBNBCommand(cmd.Cmd):
@@ -44,6 +154,10 @@ class HBNBCommand(cmd.Cmd):
         "Amenity",
         "Review"
     }
+    __batch = None
+    __every = 0
+    __done = 0
+    __started = 0
 
     def empt(self):
         """Placeholder method with an empty docstring"""
@@ -51,25 +165,74 @@ class HBNBCommand(cmd.Cmd):
 
     def default(self, arg):
         """Default method for handling unknown commands"""
-        ar = {
-            "all": self.do_all,
-            "show": self.do_show,
-            "destroy": self.do_destroy,
-            "count": self.do_count,
-            "update": self.do_update
-        }
-        m = re.search(r"\.", arg)
-        if m is not None:
-            h = [arg[:m.span()[0]], arg[m.span()[1]:]]
-            m = re.search(r"\((.*?)\)", h[1])
-            if m is not None:
-                cm = [h[1][:m.span()[0]], m.group()[1:-1]]
-                if cm[0] in ar.keys():
-                    call = "{} {}".format(h[0], cm[1])
-                    return ar[cm[0]](call)
+        sh = _shape(arg)
+        if sh is not None and sh[0] == "query":
+            if sh[1] not in HBNBCommand.__classes:
+                print("** class doesn't exist **")
+                return False
+            try:
+                qr = query(sh[1], sh[2])
+                self.write_objects(qr)
+            except ValueError as ee:
+                print("*** {}".format(ee))
+            return False
+        if sh is not None and sh[2] in HBNBCommand.__dispatch:
+            return getattr(self, "do_" + sh[2])(
+                "{} {}".format(sh[1], sh[3]))
         print("*** Unknown syntax: {}".format(arg))
         return False
 
+    def postcmd(self, stop, line):
+        """Count the commands run in a batch, writing every n of them"""
+        if self.__batch is not None and line.split(" ")[0] != "begin":
+            self.__done += 1
+            if self.__every and self.__done % self.__every == 0:
+                storage.flush()
+        return stop
+
+    def postloop(self):
+        """Write the saves of a batch left open"""
+        if self.__batch is not None:
+            self.do_commit("")
+
+    def run_batch(self, lines, every=0):
+        """Run the commands in lines as one batch"""
+        self.do_begin(str(every))
+        for ln in lines:
+            ln = ln.strip()
+            if ln and self.postcmd(self.onecmd(ln), ln):
+                break
+        self.postloop()
+
+    def do_begin(self, arg):
+        """Usage: begin [<n>]
+        Keep changes in memory until commit, or write them every n commands.
+        """
+        h = parse(arg)
+        if self.__batch is not None:
+            print("** batch already begun **")
+        elif len(h) > 0 and not h[0].isdigit():
+            print("** invalid number **")
+        else:
+            self.__batch = storage.batch()
+            self.__batch.__enter__()
+            self.__every = int(h[0]) if len(h) > 0 else 0
+            self.__done = 0
+            self.__started = time.perf_counter()
+
+    def do_commit(self, arg):
+        """Usage: commit
+        Write the changes made since begin and report the commands per second.
+        """
+        if self.__batch is None:
+            print("** no batch begun **")
+            return
+        batch, self.__batch = self.__batch, None
+        batch.__exit__(None, None, None)
+        tm = time.perf_counter() - self.__started
+        print("{} commands in {:.3f} s ({:.0f} commands/s)".format(
+            self.__done, tm, self.__done / tm if tm else 0), file=sys.stderr)
+
     def do_quit(self, arg):
         """Quit command to exit the program."""
         return True
@@ -89,7 +252,7 @@ class HBNBCommand(cmd.Cmd):
         elif h[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         else:
-            print(eval(h[0])().id)
+            print(storage.classes()[h[0]]().id)
             storage.save()
 
     def do_show(self, arg):
@@ -97,60 +260,126 @@ class HBNBCommand(cmd.Cmd):
         Display the string representation of a class instance of a given id.
         """
         h = parse(arg)
-        ob = storage.all()
         if len(h) == 0:
             print("** class name missing **")
         elif h[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         elif len(h) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(h[0], h[1]) not in ob:
+        elif storage.get(h[0], h[1]) is None:
             print("** no instance found **")
         else:
-            print(ob["{}.{}".format(h[0], h[1])])
+            print(storage.get(h[0], h[1]))
 
     def do_destroy(self, arg):
         """Usage: destroy <class> <id> or <class>.destroy(<id>)
         Delete a class instance of a given id."""
         h = parse(arg)
-        ob = storage.all()
         if len(h) == 0:
             print("** class name missing **")
         elif h[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         elif len(h) == 1:
             print("** instance id missing **")
-        elif "{}.{}".format(h[0], h[1]) not in ob.keys():
+        elif storage.get(h[0], h[1]) is None:
             print("** no instance found **")
         else:
-            del ob["{}.{}".format(h[0], h[1])]
+            storage.delete(storage.get(h[0], h[1]))
             storage.save()
 
     def do_all(self, arg):
         """Usage: all or all <class> or <class>.all()
         Display string representations of all instances of a given class.
-        If no class is specified, displays all instantiated objects."""
-        h = parse(arg)
+        If no class is specified, displays all instantiated objects.
+        Options: --limit <n> to stop after n, --ndjson for one JSON per line.
+        """
+        h = []
+        opts = {}
+        it = iter(parse(arg))
+        for a in it:
+            if a == "--ndjson":
+                opts["ndjson"] = True
+            elif a == "--limit":
+                n = next(it, "")
+                if not n.isdigit():
+                    print("** invalid limit **")
+                    return
+                opts["limit"] = int(n)
+            elif a.startswith("--"):
+                print("** invalid option **")
+                return
+            else:
+                h.append(a)
         if len(h) > 0 and h[0] not in HBNBCommand.__classes:
             print("** class doesn't exist **")
         else:
-            ob1 = []
-            for ob in storage.all().values():
-                if len(h) > 0 and h[0] == ob.__class__.__name__:
-                    ob1.append(ob.__str__())
-                elif len(h) == 0:
-                    ob1.append(ob.__str__())
-            print(ob1)
+            self.write_objects(
+                storage.all(h[0] if len(h) > 0 else None).values(), **opts)
+
+    def write_objects(self, obs, limit=None, ndjson=False):
+        """Write obs one at a time, as the list of their string
+        representations or as one JSON object per line"""
+        out = sys.stdout
+        if ndjson:
+            for ob in islice(obs, limit):
+                out.write(json.dumps(ob.to_dict()) + "\n")
+            return
+        sep = "["
+        for ob in islice(obs, limit):
+            out.write(sep + repr(str(ob)))
+            sep = ", "
+        out.write("[]\n" if sep == "[" else "]\n")
+
+    def __transfer(self, arg, mode):
+        """Check the arguments of import or export, and get the class
+        name, the opened file and its format"""
+        h = parse(arg)
+        if len(h) == 0:
+            print("** class name missing **")
+        elif h[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+        elif len(h) == 1:
+            print("** file name missing **")
+        else:
+            try:
+                fa = open(h[1], mode, encoding="utf-8", newline="")
+            except OSError as ee:
+                print("** {} **".format(ee.strerror.lower()))
+            else:
+                return h[0], fa, "csv" if h[1].endswith(".csv") else "ndjson"
+        return None, None, None
+
+    def do_import(self, arg):
+        """Usage: import <class> <file>
+        Create an instance for each line of an NDJSON or .csv file."""
+        name, fa, fmt = self.__transfer(arg, "r")
+        if fa is None:
+            return
+        with fa:
+            try:
+                print(storage.import_file(name, fa, fmt))
+            except ValueError as ee:
+                print("*** {}".format(ee))
+
+    def do_export(self, arg):
+        """Usage: export <class> <file>
+        Write all instances of a class to an NDJSON or .csv file."""
+        name, fa, fmt = self.__transfer(arg, "w")
+        if fa is None:
+            return
+        with fa:
+            print(storage.export_file(name, fa, fmt))
 
     def do_count(self, arg):
         """Usage: count <class> or <class>.count()
         Retrieve the number of instances of a given class."""
         h = parse(arg)
-        c = 0
-        for ob in storage.all().values():
-            if h[0] == ob.__class__.__name__:
-                c += 1
-        print(c)
+        if len(h) == 0:
+            print("** class name missing **")
+        elif h[0] not in HBNBCommand.__classes:
+            print("** class doesn't exist **")
+        else:
+            print(storage.count(h[0]))
 
     def do_update(self, arg):
         """Usage: update <class> <id> <attribute_name> <attribute_value> or
@@ -159,7 +388,6 @@ class HBNBCommand(cmd.Cmd):
         Update a class instance of a given id by adding or updating
         a given attribute key/value pair or dictionary."""
         h = parse(arg)
-        x = storage.all()
 
         if len(h) == 0:
             print("** class name missing **")
@@ -170,7 +398,8 @@ class HBNBCommand(cmd.Cmd):
         if len(h) == 1:
             print("** instance id missing **")
             return False
-        if "{}.{}".format(h[0], h[1]) not in x.keys():
+        ob = storage.get(h[0], h[1])
+        if ob is None:
             print("** no instance found **")
             return False
         if len(h) == 2:
@@ -178,29 +407,36 @@ class HBNBCommand(cmd.Cmd):
             return False
         if len(h) == 3:
             try:
-                type(eval(h[2])) != dict
-            except NameError:
+                vals = literal(h[2])
+            except ValueError:
                 print("** value missing **")
                 return False
-
-        if len(h) == 4:
-            ob = x["{}.{}".format(h[0], h[1])]
-            if h[2] in ob.__class__.__dict__.keys():
-                vp = type(ob.__class__.__dict__[h[2]])
-                ob.__dict__[h[2]] = vp(h[3])
-            else:
-                ob.__dict__[h[2]] = h[3]
-        elif type(eval(h[2])) == dict:
-            ob = x["{}.{}".format(h[0], h[1])]
-            for n, b in eval(h[2]).items():
-                if (n in ob.__class__.__dict__.keys() and
-                        type(ob.__class__.__dict__[n]) in {str, int, float}):
-                    vp = type(ob.__class__.__dict__[n])
-                    ob.__dict__[n] = vp(b)
-                else:
-                    ob.__dict__[n] = b
+            if type(vals) is not dict:
+                vals = {}
+        else:
+            vals = {h[2]: h[3]}
+        if any(type(n) is not str or n == "id" or n.startswith("__")
+               for n in vals):
+            print("** attribute can't be updated **")
+            return False
+        attrs = _schema(h[0])
+        try:
+            vals = {n: typed(attrs.get(n), b) for n, b in vals.items()}
+        except (TypeError, ValueError):
+            print("** invalid value **")
+            return False
+        for n, b in vals.items():
+            setattr(ob, n, b)
+        storage.new(ob)
         storage.save()
 
+    __dispatch = {"all", "show", "destroy", "count", "update"}
+
 
 if __name__ == "__main__":
-    HBNBCommand().cmdloop()
+    if len(sys.argv) > 2 and sys.argv[1] == "--batch":
+        with open(sys.argv[2], "r", encoding="utf-8") as fa:
+            HBNBCommand().run_batch(
+                fa, int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+    else:
+        HBNBCommand().cmdloop()
@@ -1,7 +1,64 @@
 #!/usr/bin/python3
 """Module-level docstring for "__init__.py"""
+from os import getenv
+import sys
 from models.engine.file_storage import FileStorage
 
 
-storage = FileStorage()
+def _progress(done, total):
+    """Show on stderr how much of the storage file is loaded"""
+    sys.stderr.write("\rLoading: {:3.0f}% of {} MB".format(
+        100 * done / (total or 1), total >> 20))
+    if done >= total:
+        sys.stderr.write("\n")
+
+
+def _shards(spec):
+    """Parse the shard layout in HBNB_FILE_SHARDS"""
+    if not spec:
+        return None
+    return {nm: int(n) for nm, sep, n in
+            (pr.partition(":") for pr in spec.split(",")) if n}
+
+
+if getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage(getenv("HBNB_DB_PATH"))
+elif getenv("HBNB_TYPE_STORAGE") == "columnar":
+    from models.engine.columnar_storage import ColumnarStorage
+    storage = ColumnarStorage()
+else:
+    layouts = [nm for nm in ("JOURNAL", "SHARED", "LAZY")
+               if getenv("HBNB_FILE_" + nm) == "1"]
+    if getenv("HBNB_FILE_SHARDS"):
+        layouts.append("SHARDS")
+    if len(layouts) > 1:
+        raise ValueError("HBNB_FILE_{} cannot be combined".format(
+            " and HBNB_FILE_".join(layouts)))
+    options = dict(background=getenv("HBNB_FILE_BACKGROUND") == "1",
+                   group=getenv("HBNB_FILE_GROUP") == "1",
+                   interval=float(getenv("HBNB_FILE_INTERVAL", 1)),
+                   max_dirty=int(getenv("HBNB_FILE_MAX_DIRTY", 1000)),
+                   fsync=getenv("HBNB_FILE_FSYNC", "none"),
+                   compact=getenv("HBNB_FILE_COMPACT") == "1",
+                   cache=getenv("HBNB_FILE_CACHE") != "0",
+                   progress=_progress
+                   if getenv("HBNB_FILE_PROGRESS") == "1" else None,
+                   workers=int(getenv("HBNB_FILE_WORKERS", 0)),
+                   threadsafe=getenv("HBNB_FILE_THREADSAFE") == "1")
+    if layouts == ["JOURNAL"]:
+        from models.engine.journal_storage import JournalStorage
+        storage = JournalStorage(**options)
+    elif layouts == ["SHARDS"]:
+        from models.engine.sharded_storage import ShardedStorage
+        storage = ShardedStorage(shards=_shards(getenv("HBNB_FILE_SHARDS")),
+                                 **options)
+    elif layouts == ["SHARED"]:
+        from models.engine.shared_storage import SharedStorage
+        storage = SharedStorage(**options)
+    elif layouts == ["LAZY"]:
+        from models.engine.lazy_storage import LazyStorage
+        storage = LazyStorage(**options)
+    else:
+        storage = FileStorage(**options)
 storage.reload()
@@ -6,6 +6,14 @@ from datetime import datetime
 from models import storage
 
 
+def _parse_time(tx):
+    """Parse a timestamp written by isoformat()"""
+    try:
+        return datetime.fromisoformat(tx)
+    except ValueError:
+        return datetime.strptime(tx, "%Y-%m-%dT%H:%M:%S.%f")
+
+
 class BaseModel:
 
     """BaseModel class for other classes to inherit"""
@@ -16,11 +24,11 @@ class BaseModel:
         if kwargs is not None and kwargs != {}:
             for ky in kwargs:
                 if ky == "created_at":
-                    self.__dict__["created_at"] = datetime.strptime(
-                        kwargs["created_at"], "%Y-%m-%dT%H:%M:%S.%f")
+                    self.__dict__["created_at"] = _parse_time(
+                        kwargs["created_at"])
                 elif ky == "updated_at":
-                    self.__dict__["updated_at"] = datetime.strptime(
-                        kwargs["updated_at"], "%Y-%m-%dT%H:%M:%S.%f")
+                    self.__dict__["updated_at"] = _parse_time(
+                        kwargs["updated_at"])
                 else:
                     self.__dict__[ky] = kwargs[ky]
         else:
@@ -29,6 +37,12 @@ class BaseModel:
             self.updated_at = datetime.now()
             storage.new(self)
 
+    def __setattr__(self, name, value):
+        """Set an attribute and tell storage the object changed"""
+        super().__setattr__(name, value)
+        if "id" in self.__dict__:
+            storage.touch(self, name)
+
     def __str__(self):
         """Return a string representation of the BaseModel"""
 
@@ -39,6 +53,7 @@ class BaseModel:
         """Update the 'updated_at' attribute and save to storage"""
 
         self.updated_at = datetime.now()
+        storage.new(self)
         storage.save()
 
     def to_dict(self):
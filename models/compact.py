@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""Compact model classes Module"""
+import sys
+from models import storage
+from models.base_model import _parse_time
+
+_compact = {}
+
+
+class Compact:
+
+    """Mixin for model classes that keep their attributes in slots
+
+    The attributes listed in storage.attributes() live in slots, and any
+    other attribute goes to an overflow dictionary created the first
+    time one is set.  As the model classes have no __slots__, an object
+    still has a __dict__, but nothing is ever put in it, so only its
+    empty slot is paid for.  A slot that was never set reads as the
+    class default.  Foreign keys read
+    from the file are interned, so the many objects that point to the
+    same one share a single string.
+    """
+    __slots__ = ()
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the object like BaseModel does"""
+        if not kwargs:
+            super().__init__(*args)
+            return
+        for ky, v in kwargs.items():
+            if ky in ("created_at", "updated_at"):
+                v = _parse_time(v)
+            elif ky.endswith("_id") and type(v) is str:
+                v = sys.intern(v)
+            if ky != "__class__":
+                self.__set(ky, v)
+
+    def __set(self, name, value):
+        """Set an attribute without telling storage"""
+        if name in type(self).__slots__:
+            object.__setattr__(self, name, value)
+            return
+        if self.__extra__ is None:
+            object.__setattr__(self, "__extra__", {})
+        self.__extra__[name] = value
+
+    def __getattr__(self, name):
+        """Get an overflow attribute, or the default of an unset slot"""
+        if name == "__extra__":
+            return None
+        if self.__extra__ is not None and name in self.__extra__:
+            return self.__extra__[name]
+        if name in type(self).__slots__:
+            try:
+                return getattr(type(self).__bases__[1], name)
+            except AttributeError:
+                pass
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+            type(self).__name__, name))
+
+    def __setattr__(self, name, value):
+        """Set an attribute and tell storage the object changed"""
+        self.__set(name, value)
+        try:
+            object.__getattribute__(self, "id")
+        except AttributeError:
+            return
+        storage.touch(self, name)
+
+    def __delattr__(self, name):
+        """Delete an attribute"""
+        if self.__extra__ is not None and name in self.__extra__:
+            del self.__extra__[name]
+        else:
+            object.__delattr__(self, name)
+
+    def __fields(self):
+        """Get the attributes that are set, as a dictionary"""
+        dd = {}
+        for nm in type(self).__slots__:
+            try:
+                dd[nm] = object.__getattribute__(self, nm)
+            except AttributeError:
+                pass
+        dd.pop("__extra__", None)
+        dd.update(self.__extra__ or {})
+        return dd
+
+    def __str__(self):
+        """Return a string representation of the object"""
+        return "[{}] ({}) {}".format(type(self).__name__, self.id,
+                                     self.__fields())
+
+    def to_dict(self):
+        """Return a dictionary representation of the object"""
+        m_di = self.__fields()
+        m_di["__class__"] = type(self).__name__
+        m_di["created_at"] = m_di["created_at"].isoformat()
+        m_di["updated_at"] = m_di["updated_at"].isoformat()
+        return m_di
+
+
+def compact(cls):
+    """Get the compact version of model class cls
+
+    It is a subclass of cls with the same name, generated once from
+    storage.attributes().
+    """
+    if cls not in _compact:
+        attrs = storage.attributes()
+        names = list(attrs["BaseModel"])
+        names += [n for n in attrs.get(cls.__name__, {}) if n not in names]
+        _compact[cls] = type(cls.__name__, (Compact, cls), {
+            "__slots__": tuple(names) + ("__extra__",),
+            "__module__": cls.__module__,
+            "__doc__": cls.__doc__})
+    return _compact[cls]
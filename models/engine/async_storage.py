@@ -0,0 +1,105 @@
+#!/usr/bin/python3
+"""Async Storage Module"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+
+
+class AsyncStorage:
+
+    """Async Storage Class
+
+    Wraps a storage engine, the models.storage singleton by default, so
+    async code can use it without blocking the event loop: every call
+    runs on one worker thread, so calls made through the same facade
+    run one at a time and in order, and they see and change the same
+    objects as the sync API.  Code that also changes objects from the
+    event loop thread while a save runs should use a FileStorage in
+    threadsafe mode.
+    """
+
+    def __init__(self, storage=None, chunk=100):
+        """Initialize the facade over storage
+
+        Async iteration gives the event loop a turn every chunk objects.
+        """
+        if storage is None:
+            from models import storage
+        self.__storage = storage
+        self.__chunk = chunk
+        self.__executor = None
+
+    @property
+    def storage(self):
+        """Get the storage engine behind the facade"""
+        return self.__storage
+
+    async def __run(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) on the worker thread and wait for it"""
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(
+                1, thread_name_prefix="AsyncStorage")
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__executor, functools.partial(fn, *args, **kwargs))
+
+    async def asave(self):
+        """Save objects to storage"""
+        await self.__run(self.__storage.save)
+
+    async def areload(self):
+        """Reload objects from storage"""
+        await self.__run(self.__storage.reload)
+
+    async def aflush(self):
+        """Write the saves that were recorded but not written yet"""
+        await self.__run(self.__storage.flush)
+
+    async def aget(self, cls, id):
+        """Get the object of class cls with the given id, or None"""
+        return await self.__run(self.__storage.get, cls, id)
+
+    async def aall(self, cls=None):
+        """Get all stored objects, or only those of class cls"""
+        return await self.__run(self.__storage.all, cls)
+
+    async def acount(self, cls=None):
+        """Count all stored objects, or only those of class cls"""
+        return await self.__run(self.__storage.count, cls)
+
+    async def afind(self, cls, **kwargs):
+        """Get the objects of class cls whose attributes equal kwargs"""
+        return await self.__run(self.__storage.find, cls, **kwargs)
+
+    async def anew(self, obj):
+        """Add a new object to storage"""
+        await self.__run(self.__storage.new, obj)
+
+    async def adelete(self, obj=None):
+        """Remove obj from storage if it is there"""
+        await self.__run(self.__storage.delete, obj)
+
+    async def aiter(self, cls=None):
+        """Yield the stored objects, or only those of class cls
+
+        The objects are listed on the worker thread, then yielded a
+        chunk at a time with a turn of the event loop in between.
+        """
+        obs = await self.__run(lambda: list(self.__storage.all(cls).values()))
+        for ix, ob in enumerate(obs, 1):
+            yield ob
+            if ix % self.__chunk == 0:
+                await asyncio.sleep(0)
+
+    def __aiter__(self):
+        """Iterate over all stored objects"""
+        return self.aiter()
+
+    async def aclose(self):
+        """Write pending saves and stop the worker thread"""
+        close = getattr(self.__storage, "flush", self.__storage.save)
+        try:
+            await self.__run(close)
+        finally:
+            if self.__executor is not None:
+                self.__executor.shutdown()
+                self.__executor = None
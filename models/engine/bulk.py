@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""Bulk import and export Module"""
+import csv
+import datetime
+import json
+import uuid
+
+_extra = "__extra__"
+formats = ("ndjson", "csv")
+
+
+def schema(storage, name):
+    """Get the attributes and their types for class name"""
+    attrs = dict(storage.attributes()["BaseModel"])
+    attrs.update(storage.attributes().get(name, {}))
+    return attrs
+
+
+def read_rows(fa, fmt):
+    """Yield the rows of the NDJSON or CSV file fa as dictionaries
+
+    Empty CSV cells are left out, so the object gets the class default.
+    """
+    if fmt == "csv":
+        for rw in csv.DictReader(fa):
+            yield {k: v for k, v in rw.items() if v != ""}
+    elif fmt == "ndjson":
+        for ln in fa:
+            if ln.strip():
+                yield json.loads(ln)
+    else:
+        raise ValueError("unknown format: {}".format(fmt))
+
+
+def coerce(attrs, name, row):
+    """Get the keyword arguments that build an object of class name
+    from row, with values converted to their types in attrs
+
+    The id and timestamps are made up when missing.
+    """
+    dd = {}
+    for k, v in row.items():
+        if k == "__class__":
+            if v != name:
+                raise ValueError("row of class {}".format(v))
+            continue
+        if k == _extra:
+            dd.update(json.loads(v))
+            continue
+        tp = attrs.get(k)
+        if tp is datetime.datetime or tp is None or type(v) is tp:
+            dd[k] = v
+        elif tp in (list, dict) and type(v) is str:
+            dd[k] = json.loads(v)
+        else:
+            dd[k] = tp(v)
+    if "id" not in dd:
+        dd["id"] = str(uuid.uuid4())
+    for k in ("created_at", "updated_at"):
+        if k not in dd:
+            dd[k] = datetime.datetime.now().isoformat()
+    return dd
+
+
+def import_rows(storage, cls, rows, chunk=10000):
+    """Add an object of class cls to storage for every row, chunk at a
+    time through new_many(), then save once; return how many"""
+    name = cls if isinstance(cls, str) else cls.__name__
+    cl = storage.classes()[name]
+    attrs = schema(storage, name)
+    n = 0
+    obs = []
+    for rw in rows:
+        n += 1
+        if type(rw) is not dict:
+            raise ValueError("row {}: not an object".format(n))
+        try:
+            obs.append(cl(**coerce(attrs, name, rw)))
+        except (TypeError, ValueError) as ee:
+            raise ValueError("row {}: {}".format(n, ee)) from ee
+        if len(obs) == chunk:
+            storage.new_many(obs)
+            obs = []
+    storage.new_many(obs)
+    storage.save()
+    return n
+
+
+def write_rows(storage, cls, fa, fmt):
+    """Write the objects of class cls to fa as NDJSON or CSV, one at a
+    time; return how many
+
+    CSV has a column for each attribute of the class, and one holding
+    the other attributes of each object, and those set to None, as JSON.
+    """
+    name = cls if isinstance(cls, str) else cls.__name__
+    obs = storage.all(name).values()
+    if fmt == "ndjson":
+        wr = None
+    elif fmt == "csv":
+        cols = list(schema(storage, name))
+        wr = csv.writer(fa)
+        wr.writerow(cols + [_extra])
+    else:
+        raise ValueError("unknown format: {}".format(fmt))
+    n = 0
+    for ob in obs:
+        dd = ob.to_dict()
+        n += 1
+        if wr is None:
+            fa.write(json.dumps(dd) + "\n")
+            continue
+        del dd["__class__"]
+        rw = [dd.pop(k, "") if dd.get(k) is not None else "" for k in cols]
+        wr.writerow([json.dumps(v) if type(v) in (list, dict) else v
+                     for v in rw] + [json.dumps(dd) if dd else ""])
+    return n
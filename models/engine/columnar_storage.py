@@ -0,0 +1,265 @@
+#!/usr/bin/python3
+"""Columnar Storage Module"""
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate
+import datetime
+import json
+import os
+import re
+import struct
+import sys
+from models.engine.bulk import schema
+from models.engine.file_storage import FileStorage, _paused_gc
+
+_magic = b"HBNBCOL1"
+_kinds = {int: "q", float: "d", datetime.datetime: "t", str: "s"}
+_epoch = datetime.datetime(1970, 1, 1)
+_us = datetime.timedelta(microseconds=1)
+_extra = "__extra__"
+_missing = object()
+_uuid = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-"
+                   r"[0-9a-f]{12}")
+
+
+class ColumnarStorage(FileStorage):
+
+    """Columnar Storage Class
+
+    Objects are kept in memory exactly like FileStorage does, but they
+    are saved as one binary file per class in a directory.  Each
+    attribute from attributes() is stored as a column: ints, floats and
+    datetimes as arrays of 64-bit numbers, strings as one text with
+    offsets (or 16 bytes each if they are all UUIDs), anything else as
+    JSON.  Attributes outside the schema, or whose value does not have
+    the schema type, go to a JSON column.  A save rewrites only the
+    files of classes with objects added, changed or deleted since the
+    last one.  Inside a "with storage.batch():" block saves are only
+    recorded, and the files are written once when the outermost block
+    exits.
+    """
+
+    def __init__(self, path=None):
+        """Initialize storage on the directory path (file.columns)"""
+        super().__init__()
+        self.__dir = "file.columns" if path is None else path
+        self.__pending = False
+        self.__batches = 0
+        self.__written = None
+
+    def save(self):
+        """Save objects to one columnar file per class, or record the
+        save for the end of the batch"""
+        self.__pending = True
+        if not self.__batches:
+            self.flush()
+
+    def flush(self):
+        """Write the files if a save was recorded but not written yet"""
+        if self.__pending:
+            self.__pending = False
+            self.__write_files()
+
+    @contextmanager
+    def batch(self):
+        """Defer every save in the block to one write when it exits"""
+        self.__batches += 1
+        try:
+            yield self
+        finally:
+            self.__batches -= 1
+            if not self.__batches:
+                self.flush()
+
+    def __write_files(self):
+        """Rewrite the columnar file of every class whose objects changed
+
+        A class changed if one of its objects is marked dirty or it has
+        not as many objects as were last written; the first save of a
+        store that was not reloaded rewrites every class.
+        """
+        os.makedirs(self.__dir, exist_ok=True)
+        dirty = set(self._dirty())
+        changed = {ky.partition(".")[0] for ky in dirty}
+        by_class = {}
+        for ob in list(self.all().values()):
+            by_class.setdefault(type(ob).__name__, []).append(ob)
+        if self.__written is None:
+            self.__written = {}
+            changed.update(self.classes())
+        for name in self.classes():
+            obs = by_class.get(name, [])
+            if (name not in changed and
+                    len(obs) == self.__written.get(name, 0)):
+                continue
+            pt = os.path.join(self.__dir, name + ".col")
+            if not obs:
+                if os.path.isfile(pt):
+                    os.remove(pt)
+            else:
+                with open(pt + ".tmp", "wb") as fa:
+                    self.__write(fa, name, obs)
+                os.replace(pt + ".tmp", pt)
+            self.__written[name] = len(obs)
+        self._dirty().difference_update(dirty)
+
+    @_paused_gc()
+    def reload(self):
+        """Reload objects from the columnar files"""
+        self.__written = {}
+        if not os.path.isdir(self.__dir):
+            return
+        obs = []
+        for name, cl in self.classes().items():
+            pt = os.path.join(self.__dir, name + ".col")
+            if not os.path.isfile(pt):
+                continue
+            with open(pt, "rb") as fa:
+                data = fa.read()
+            if data[:8] != _magic:
+                raise ValueError("{} is not a columnar file".format(pt))
+            new = [cl.__new__(cl)
+                   for ix in range(struct.unpack_from("<Q", data, 8)[0])]
+            self.__read(data, [ob.__dict__ for ob in new])
+            obs.extend(new)
+            self.__written[name] = len(new)
+        for ob in list(self.all().values()):
+            self.delete(ob)
+        self.new_many(obs)
+        self._dirty().clear()
+
+    def __write(self, fa, name, obs):
+        """Write the objects of class name as columns"""
+        attrs = schema(self, name)
+        dicts = [ob.__dict__ for ob in obs]
+        n = len(dicts)
+        extra = [None if dd.keys() <= attrs.keys() else
+                 {k: v for k, v in dd.items() if k not in attrs}
+                 for dd in dicts]
+        cols = []
+        for at, tp in attrs.items():
+            kd = _kinds.get(tp, "j")
+            vals = [dd.get(at, _missing) for dd in dicts]
+            if kd != "j" and self.__fits(kd, vals):
+                has = b"\x01" * n
+            else:
+                has = bytearray(n)
+                for ix, v in enumerate(vals):
+                    if v is _missing:
+                        vals[ix] = None
+                    elif kd == "j" or self.__fits(kd, [v]):
+                        has[ix] = 1
+                    else:
+                        extra[ix] = dict(extra[ix] or {})
+                        extra[ix][at] = v
+                        vals[ix] = None
+                if not any(has):
+                    continue
+            if kd == "s" and all(v is None or _uuid.fullmatch(v)
+                                 for v in vals):
+                kd = "u"
+            cols.append((at, kd, has, vals))
+        if any(extra):
+            cols.append((_extra, "j", bytearray(1 if ex else 0
+                                                for ex in extra), extra))
+        fa.write(_magic + struct.pack("<QI", n, len(cols)))
+        for cl in cols:
+            self.__write_column(fa, *cl)
+
+    @staticmethod
+    def __fits(kd, vals):
+        """Tell whether all of vals can be stored in a column of kind kd"""
+        if kd == "q":
+            return (all(type(v) is int for v in vals) and
+                    -2 ** 63 <= min(vals, default=0) and
+                    max(vals, default=0) < 2 ** 63)
+        if kd == "d":
+            return all(type(v) is float for v in vals)
+        if kd == "t":
+            return all(type(v) is datetime.datetime and v.tzinfo is None
+                       for v in vals)
+        return all(type(v) is str for v in vals)
+
+    @staticmethod
+    def __write_column(fa, at, kd, has, vals):
+        """Write one column: its name, kind, presence flags and values"""
+        nm = at.encode("utf-8")
+        fa.write(struct.pack("<H", len(nm)) + nm + kd.encode() + has)
+        if kd == "u":
+            fa.write(bytes.fromhex("".join(
+                "0" * 32 if v is None else v.replace("-", "")
+                for v in vals)))
+            return
+        if kd in "qdt":
+            if kd == "t":
+                vals = [None if v is None else (v - _epoch) // _us
+                        for v in vals]
+            ar = array("d" if kd == "d" else "q",
+                       (0 if v is None else v for v in vals))
+            if sys.byteorder == "big":
+                ar.byteswap()
+            fa.write(ar.tobytes())
+            return
+        if kd == "j":
+            vals = ["" if v is None else json.dumps(v) for v in vals]
+        else:
+            vals = ["" if v is None else v for v in vals]
+        offs = array("q", accumulate((len(v) for v in vals), initial=0))
+        if sys.byteorder == "big":
+            offs.byteswap()
+        bl = "".join(vals).encode("utf-8")
+        fa.write(offs.tobytes() + struct.pack("<Q", len(bl)) + bl)
+
+    @staticmethod
+    def __read(data, rows):
+        """Fill the attribute dictionaries rows from a columnar file"""
+        nc = struct.unpack_from("<I", data, 16)[0]
+        n = len(rows)
+        ps = 20
+        for ic in range(nc):
+            ln = struct.unpack_from("<H", data, ps)[0]
+            at = data[ps + 2:ps + 2 + ln].decode("utf-8")
+            kd = chr(data[ps + 2 + ln])
+            ps += 3 + ln
+            has = data[ps:ps + n]
+            ps += n
+            if kd == "u":
+                hx = data[ps:ps + 16 * n].hex()
+                ps += 16 * n
+                vals = ["-".join((hx[ix:ix + 8], hx[ix + 8:ix + 12],
+                                  hx[ix + 12:ix + 16], hx[ix + 16:ix + 20],
+                                  hx[ix + 20:ix + 32]))
+                        for ix in range(0, 32 * n, 32)]
+            elif kd in "qdt":
+                ar = array("d" if kd == "d" else "q")
+                ar.frombytes(data[ps:ps + 8 * n])
+                ps += 8 * n
+                if sys.byteorder == "big":
+                    ar.byteswap()
+                vals = ar.tolist()
+            else:
+                offs = array("q")
+                offs.frombytes(data[ps:ps + 8 * (n + 1)])
+                ps += 8 * (n + 1)
+                if sys.byteorder == "big":
+                    offs.byteswap()
+                ln = struct.unpack_from("<Q", data, ps)[0]
+                tx = data[ps + 8:ps + 8 + ln].decode("utf-8")
+                ps += 8 + ln
+                vals = [tx[offs[ix]:offs[ix + 1]] for ix in range(n)]
+            if kd == "t":
+                vals = [_epoch + datetime.timedelta(microseconds=v)
+                        for v in vals]
+            if b"\x00" not in has and at != _extra:
+                if kd == "j":
+                    vals = [json.loads(v) for v in vals]
+                for dd, v in zip(rows, vals):
+                    dd[at] = v
+                continue
+            for ix in range(n):
+                if has[ix]:
+                    v = json.loads(vals[ix]) if kd == "j" else vals[ix]
+                    if at == _extra:
+                        rows[ix].update(v)
+                    else:
+                        rows[ix][at] = v
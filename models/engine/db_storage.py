@@ -0,0 +1,242 @@
+#!/usr/bin/python3
+"""Database Storage Module"""
+from contextlib import contextmanager
+import datetime
+import json
+import sqlite3
+import weakref
+from models.engine.bulk import schema
+from models.engine.file_storage import FileStorage
+
+_types = {str: "TEXT", int: "INTEGER", float: "REAL",
+          datetime.datetime: "TEXT"}
+_extra = "__extra__"
+
+
+class DBStorage:
+
+    """Database Storage Class
+
+    Objects live in a SQLite database with one table per class and one
+    column per attribute from attributes(), so only the objects asked
+    for are in memory.  Objects passed to new() are written when the
+    store is next read or saved, and everything written since the last
+    save() is committed by it as one transaction; objects loaded from
+    the database are written again once touched; inside a
+    "with storage.batch():" block saves only write, and the block
+    commits once when it exits.  Attributes outside
+    the schema, and values whose type differs from the schema, are kept
+    as JSON in an extra column.  The connection may be used from a
+    thread other than the one that opened it, as AsyncStorage does, but
+    not from two threads at once.
+    """
+    classes = FileStorage.classes
+    attributes = FileStorage.attributes
+    indexes = FileStorage.indexes
+    query = FileStorage.query
+    import_file = FileStorage.import_file
+    export_file = FileStorage.export_file
+
+    def __init__(self, path=None):
+        """Initialize storage on the database file path (file.db)"""
+        self.__path = "file.db" if path is None else path
+        self.__conn = None
+        self.__pending = {}
+        self.__loaded = weakref.WeakValueDictionary()
+        self.__batches = 0
+
+    def reload(self):
+        """Connect to the database, creating missing tables and columns
+
+        Changes not saved yet are discarded.
+        """
+        if self.__conn is not None:
+            self.__conn.close()
+        self.__conn = sqlite3.connect(self.__path, check_same_thread=False)
+        self.__pending = {}
+        self.__loaded = weakref.WeakValueDictionary()
+        cr = self.__conn.cursor()
+        for name in self.classes():
+            attrs = schema(self, name)
+            cr.execute('CREATE TABLE IF NOT EXISTS "{}" '
+                       '(id TEXT PRIMARY KEY)'.format(name))
+            have = {r[1] for r in cr.execute(
+                'PRAGMA table_info("{}")'.format(name))}
+            for at, tp in list(attrs.items()) + [(_extra, str)]:
+                if at not in have:
+                    cr.execute('ALTER TABLE "{}" ADD COLUMN "{}" {}'.format(
+                        name, at, _types.get(tp, "TEXT")))
+                if at.endswith("_id"):
+                    cr.execute('CREATE INDEX IF NOT EXISTS "{0}_{1}" '
+                               'ON "{0}" ("{1}")'.format(name, at))
+        self.__conn.commit()
+
+    def close(self):
+        """Save pending changes and close the database"""
+        if self.__conn is not None:
+            self.save()
+            self.__conn.close()
+            self.__conn = None
+
+    def new(self, obj):
+        """Add a new object to storage, or mark a stored one as changed"""
+        ky = "{}.{}".format(type(obj).__name__, obj.id)
+        self.__pending[ky] = obj
+        self.__loaded[ky] = obj
+
+    def touch(self, obj, name=None):
+        """Mark obj as changed, so that the next save writes it"""
+        ky = "{}.{}".format(type(obj).__name__, obj.id)
+        if self.__loaded.get(ky) is obj:
+            self.__pending[ky] = obj
+
+    def new_many(self, objs):
+        """Add many new objects to storage at once"""
+        for ob in objs:
+            self.new(ob)
+        self.__write_pending()
+
+    def delete(self, obj=None):
+        """Remove obj from storage if it is there"""
+        if obj is None:
+            return
+        ky = "{}.{}".format(type(obj).__name__, obj.id)
+        self.__pending.pop(ky, None)
+        self.__loaded.pop(ky, None)
+        self.__conn.execute('DELETE FROM "{}" WHERE id = ?'.format(
+            type(obj).__name__), (obj.id,))
+
+    def save(self):
+        """Commit everything written since the last save"""
+        self.__write_pending()
+        if not self.__batches:
+            self.__conn.commit()
+
+    def flush(self):
+        """Write and commit everything changed since the last commit"""
+        self.__write_pending()
+        self.__conn.commit()
+
+    @contextmanager
+    def batch(self):
+        """Defer the commits of saves in the block to when it exits"""
+        self.__batches += 1
+        try:
+            yield self
+        finally:
+            self.__batches -= 1
+            if not self.__batches:
+                self.flush()
+
+    def __write_pending(self):
+        """Write the objects passed to new() since the last write"""
+        by_class = {}
+        for ob in self.__pending.values():
+            by_class.setdefault(type(ob).__name__, []).append(ob)
+        self.__pending = {}
+        for name, obs in by_class.items():
+            attrs = schema(self, name)
+            cols = list(attrs) + [_extra]
+            self.__conn.executemany(
+                'INSERT OR REPLACE INTO "{}" ({}) VALUES ({})'.format(
+                    name, ", ".join('"{}"'.format(c) for c in cols),
+                    ", ".join("?" * len(cols))),
+                [self.__row(attrs, ob.__dict__) for ob in obs])
+
+    @staticmethod
+    def __row(attrs, dd):
+        """Get the column values for an object's attributes"""
+        row = []
+        extra = {k: v for k, v in dd.items() if k not in attrs}
+        for at, tp in attrs.items():
+            if at not in dd:
+                row.append(None)
+                continue
+            v = dd[at]
+            if type(v) is tp and tp is datetime.datetime:
+                row.append(v.isoformat())
+            elif type(v) is tp and tp in _types:
+                row.append(v)
+            elif tp not in _types and v is not None:
+                row.append(json.dumps(v))
+            else:
+                extra[at] = v
+                row.append(None)
+        row.append(json.dumps(extra) if extra else None)
+        return row
+
+    def __objects(self, name, sql="", args=()):
+        """Get the objects of class name in rows matching sql"""
+        self.__write_pending()
+        attrs = schema(self, name)
+        cl = self.classes()[name]
+        cr = self.__conn.execute('SELECT * FROM "{}" {}'.format(name, sql),
+                                 args)
+        cols = [d[0] for d in cr.description]
+        obs = {}
+        for rw in cr:
+            ky = "{}.{}".format(name, rw[0])
+            ob = self.__loaded.get(ky)
+            if ob is None:
+                ob = cl.__new__(cl)
+                dd = ob.__dict__
+                for at, v in zip(cols, rw):
+                    if v is None:
+                        continue
+                    tp = attrs.get(at, str)
+                    if at == _extra:
+                        dd.update(json.loads(v))
+                    elif tp is datetime.datetime:
+                        dd[at] = datetime.datetime.fromisoformat(v)
+                    elif tp not in _types:
+                        dd[at] = json.loads(v)
+                    else:
+                        dd[at] = v
+                self.__loaded[ky] = ob
+            obs[ky] = ob
+        return obs
+
+    def all(self, cls=None):
+        """Get all stored objects, or only those of class cls"""
+        if cls is not None:
+            name = cls if isinstance(cls, str) else cls.__name__
+            return self.__objects(name) if name in self.classes() else {}
+        obs = {}
+        for name in self.classes():
+            obs.update(self.__objects(name))
+        return obs
+
+    def count(self, cls=None):
+        """Count all stored objects, or only those of class cls"""
+        self.__write_pending()
+        if cls is None:
+            return sum(self.count(name) for name in self.classes())
+        name = cls if isinstance(cls, str) else cls.__name__
+        if name not in self.classes():
+            return 0
+        return self.__conn.execute(
+            'SELECT COUNT(*) FROM "{}"'.format(name)).fetchone()[0]
+
+    def get(self, cls, id):
+        """Get the object of class cls with the given id, or None"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        if name not in self.classes():
+            return None
+        ob = self.__objects(name, "WHERE id = ?", (id,))
+        return ob.get("{}.{}".format(name, id))
+
+    def find(self, cls, **kwargs):
+        """Get the objects of class cls whose attributes equal kwargs"""
+        name = cls if isinstance(cls, str) else cls.__name__
+        if name not in self.classes():
+            return {}
+        attrs = schema(self, name)
+        cond = [k for k, v in kwargs.items()
+                if k in attrs and type(v) is attrs[k] and
+                attrs[k] in (str, int, float)]
+        obs = self.__objects(
+            name, "WHERE " + " AND ".join(
+                '"{}" = ?'.format(k) for k in cond) if cond else "",
+            [kwargs[k] for k in cond])
+        return {ky: ob for ky, ob in obs.items()
+                if all(getattr(ob, k, None) == v for k, v in kwargs.items())}
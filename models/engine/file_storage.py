@@ -1,30 +1,794 @@
 #!/usr/bin/python3
 """File Storage Module"""
+import atexit
+import codecs
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+from contextlib import contextmanager
 import datetime
+import functools
+import gc
 import json
+import multiprocessing
 import os
+import re
+import threading
+import time
+from models.engine import bulk
+from models.engine.query import Query
+
+_ws = re.compile(r"[ \t\n\r]*")
+_boundary = re.compile(rb'\}(,)[ \t\n\r]*"[A-Za-z_][A-Za-z0-9_]*\.')
+
+
+def _entry(dec, tx, ix):
+    """Parse the entry of a JSON object text that starts at ix
+
+    Return its key, its value, the span of its value and where the next
+    entry starts, or None after the last entry.
+    """
+    ix = _ws.match(tx, ix).end()
+    if tx[ix] != '"':
+        raise ValueError("Expecting '\"' at char " + str(ix))
+    ky, ix = json.decoder.scanstring(tx, ix + 1)
+    ix = _ws.match(tx, ix).end()
+    if tx[ix] != ":":
+        raise ValueError("Expecting ':' at char " + str(ix))
+    st = _ws.match(tx, ix + 1).end()
+    val, en = dec.raw_decode(tx, st)
+    ix = _ws.match(tx, en).end()
+    if tx[ix] not in ",}":
+        raise ValueError("Expecting ',' at char " + str(ix))
+    return ky, val, st, en, ix + 1 if tx[ix] == "," else None
+
+
+def _entries(fa, size=1 << 20, progress=None):
+    """Yield the key, value and value text of each entry of a JSON
+    object file
+
+    fa is read size bytes at a time and only the part of the last chunk
+    not parsed yet is kept, so memory does not grow with the file.
+    progress, if given, is called with the bytes read so far and the
+    size of the file after each chunk.
+    """
+    dec = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    total = os.fstat(fa.fileno()).st_size
+    done = 0
+    tx = ""
+    ix = None
+    while True:
+        bl = fa.read(size)
+        done += len(bl)
+        tx = tx[ix or 0:] + utf8.decode(bl, final=not bl)
+        ix = 0 if ix is not None else None
+        if progress is not None and bl:
+            progress(done, total)
+        while True:
+            try:
+                if ix is None:
+                    st = _ws.match(tx, 0).end()
+                    if tx[st] != "{":
+                        raise ValueError("Expecting '{' at char " + str(st))
+                    if tx[_ws.match(tx, st + 1).end()] == "}":
+                        return
+                    ix = st + 1
+                ky, val, st, en, nx = _entry(dec, tx, ix)
+            except (IndexError, ValueError) as ee:
+                if not bl:
+                    raise ValueError("{} is not a JSON object".format(
+                        fa.name)) from ee
+                break
+            yield ky, val, tx[st:en]
+            if nx is None:
+                return
+            ix = nx
+
+
+def _load_range(path, start, end, parse=True):
+    """Decode the entries of a JSON object file whose comma is in
+    [start, end)
+
+    This runs in the worker processes of a parallel reload.  An entry
+    is taken to follow a comma that comes right after a closing brace
+    and before a "<Class>.<id>" key, which the caller checks by
+    chaining the ranges.  Return the offsets of the commas before the
+    first entry and after the last one (0 and -1 at the ends of the
+    object), and the key and attributes of each entry, with timestamps
+    parsed if parse is true.
+    """
+    from models.base_model import _parse_time
+    dec = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as fa:
+        if start == 0:
+            tx = utf8.decode(fa.read(end))
+            ix = _ws.match(tx, 0).end()
+            if tx[ix:ix + 1] != "{":
+                raise ValueError("Expecting '{' at char " + str(ix))
+            first = base = 0
+            ix += 1
+            if tx[_ws.match(tx, ix).end():][:1] == "}":
+                return first, -1, []
+        else:
+            fa.seek(start - 1)
+            bl = fa.read(end - start + 1)
+            mt = _boundary.search(bl)
+            if mt is None:
+                return None, None, []
+            first = start - 1 + mt.start(1)
+            base = first + 1
+            tx = utf8.decode(bl[mt.start(1) + 1:])
+            ix = 0
+        ln = len(tx)
+        items = []
+        while True:
+            try:
+                ky, dd, st, en, nx = _entry(dec, tx, ix)
+            except (IndexError, ValueError):
+                bl = fa.read(1 << 16)
+                if not bl:
+                    raise ValueError("{} is not a JSON object".format(path))
+                tx += utf8.decode(bl)
+                continue
+            if parse:
+                for at in ("created_at", "updated_at"):
+                    if at in dd:
+                        dd[at] = _parse_time(dd[at])
+            items.append((ky, dd))
+            if nx is None:
+                return first, -1, items
+            if nx - 1 >= ln:
+                return first, base + len(tx[:nx - 1].encode("utf-8")), items
+            ix = nx
+
+
+@contextmanager
+def _paused_gc():
+    """Pause the cyclic garbage collector while many objects are built
+
+    Otherwise it runs over and over on the objects built so far, which
+    takes most of the time of a reload.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class _RWLock:
+
+    """Readers-writer lock
+
+    Any number of threads may hold it for reading, or one for writing.
+    A waiting writer keeps new readers out, so writers are not starved.
+    A thread that holds the lock may take it again for reading, and a
+    writer may take it again for writing, but a reader cannot upgrade.
+    """
+
+    def __init__(self):
+        """Initialize an unlocked lock"""
+        self.__cond = threading.Condition()
+        self.__readers = 0
+        self.__writer = None
+        self.__waiting = 0
+        self.__local = threading.local()
+
+    @contextmanager
+    def read(self):
+        """Hold the lock for reading"""
+        held = getattr(self.__local, "reads", 0)
+        self.__local.reads = held + 1
+        try:
+            if held or self.__writer == threading.get_ident():
+                yield
+                return
+            with self.__cond:
+                while self.__writer is not None or self.__waiting:
+                    self.__cond.wait()
+                self.__readers += 1
+            try:
+                yield
+            finally:
+                with self.__cond:
+                    self.__readers -= 1
+                    if not self.__readers:
+                        self.__cond.notify_all()
+        finally:
+            self.__local.reads = held
+
+    @contextmanager
+    def write(self):
+        """Hold the lock for writing"""
+        me = threading.get_ident()
+        if self.__writer == me:
+            yield
+            return
+        if getattr(self.__local, "reads", 0):
+            raise RuntimeError("cannot write while holding the read lock")
+        with self.__cond:
+            self.__waiting += 1
+            while self.__writer is not None or self.__readers:
+                self.__cond.wait()
+            self.__waiting -= 1
+            self.__writer = me
+        try:
+            yield
+        finally:
+            with self.__cond:
+                self.__writer = None
+                self.__cond.notify_all()
+
+
+def _reads(fn):
+    """Make method fn hold the storage lock for reading in threadsafe
+    mode, or for writing when it would build objects or indexes"""
+    @functools.wraps(fn)
+    def locked(self, *args, **kwargs):
+        lock = self._lock()
+        if lock is None:
+            return fn(self, *args, **kwargs)
+        with lock.read():
+            if self._built():
+                return fn(self, *args, **kwargs)
+        with lock.write():
+            return fn(self, *args, **kwargs)
+    return locked
+
+
+def _writes(fn):
+    """Make method fn hold the storage lock for writing in threadsafe
+    mode"""
+    @functools.wraps(fn)
+    def locked(self, *args, **kwargs):
+        lock = self._lock()
+        if lock is None:
+            return fn(self, *args, **kwargs)
+        with lock.write():
+            return fn(self, *args, **kwargs)
+    return locked
 
 
 class FileStorage:
 
-    """File Storage Class"""
+    """File Storage Class
+
+    Objects are kept in memory and saved to one JSON file; the journal,
+    sharded, shared and lazy layouts are subclasses.
+    """
     __file_path = "file.json"
     __objects = {}
+    __by_class = {}
+    __by_value = {}
+    __values = {}
+    __indexed_attrs = {}
+    __indexed = None
+    __indexed_len = 0
+    __dirty = set()
+    __texts = {}
+    __lock = _RWLock()
+    _exclusive_save = False
 
-    def all(self):
-        """Get all stored objects"""
-        return FileStorage.__objects
+    def __init__(self, path=None, background=False, interval=1.0,
+                 max_dirty=1000, group=False, fsync="none", compact=False,
+                 cache=True, progress=None, workers=0, threadsafe=False):
+        """Initialize storage on path (file.json by default)
+
+        background and group hold saves back until max_dirty are pending
+        or the first is interval seconds old; fsync is "none", "file" or
+        "dir"; cache keeps the JSON text of each object between saves.
+        """
+        if fsync not in ("none", "file", "dir"):
+            raise ValueError("fsync must be 'none', 'file' or 'dir'")
+        if background and not cache:
+            raise ValueError("background mode needs the text cache")
+        if background and group:
+            raise ValueError("background and group modes cannot be "
+                             "combined")
+        if path is not None:
+            self.__file_path = path
+        self.__fsync = fsync
+        self.__compact = compact
+        self.__cache = cache
+        self.__progress = progress
+        self.__workers = workers
+        self.__threadsafe = threadsafe
+        self.__background = background
+        self.__group = group
+        self.__interval = interval
+        self.__max_dirty = max_dirty
+        self.__pending = 0
+        self.__pending_since = None
+        self.__batches = 0
+        self.__closed = False
+        self.__failed = None
+        self.__captured = {}
+        self.__cond = threading.Condition()
+        self.__write_lock = threading.Lock()
+        if background:
+            self.__worker = threading.Thread(target=self.__snapshot_loop,
+                                             daemon=True)
+            self.__worker.start()
+        if background or group:
+            atexit.register(self.close)
+
+    def _lock(self):
+        """Get the lock shared by all instances in threadsafe mode, or
+        None"""
+        return FileStorage.__lock if self.__threadsafe else None
+
+    def __holding(self, write=False):
+        """Get a context that holds the lock in threadsafe mode"""
+        if not self.__threadsafe:
+            return contextlib.nullcontext()
+        if write:
+            return FileStorage.__lock.write()
+        return FileStorage.__lock.read()
+
+    def _built(self):
+        """Tell whether every object is built and indexed, so reading
+        changes nothing"""
+        return self.__in_sync()
+
+    @_reads
+    def all(self, cls=None):
+        """Get all stored objects, or only those of class cls"""
+        if cls is None:
+            if self.__threadsafe:
+                return dict(FileStorage.__objects)
+            return FileStorage.__objects
+        return dict(self._class_index().get(self._name(cls), {}))
+
+    @_reads
+    def count(self, cls=None):
+        """Count all stored objects, or only those of class cls"""
+        if cls is None:
+            return len(FileStorage.__objects)
+        return len(self._class_index().get(self._name(cls), {}))
+
+    @_reads
+    def get(self, cls, id):
+        """Get the object of class cls with the given id, or None"""
+        return FileStorage.__objects.get("{}.{}".format(self._name(cls), id))
+
+    @_reads
+    def find(self, cls, **kwargs):
+        """Get the objects of class cls whose attributes equal kwargs
+
+        An attribute listed in indexes() is looked up in its hash index,
+        other attributes are compared on every object of cls.
+        """
+        name = self._name(cls)
+        found = self._class_index().get(name, {})
+        by_value = FileStorage.__by_value.get(name, {})
+        for k, v in kwargs.items():
+            if k in by_value:
+                try:
+                    found = by_value[k].get(v, {})
+                except TypeError:
+                    continue
+                break
+        return {ky: ob for ky, ob in list(found.items())
+                if all(getattr(ob, k, None) == v for k, v in kwargs.items())}
 
+    @_writes
     def new(self, obj):
-        """Add a new object to storage"""
+        """Add a new object to storage, or reindex a stored one"""
         ky = "{}.{}".format(type(obj).__name__, obj.id)
-        FileStorage.__objects[ky] = obj
+        FileStorage.__dirty.add(ky)
+        if self.__in_sync():
+            old = FileStorage.__objects.get(ky)
+            if old is not None:
+                self.__unindex(ky, old)
+            self.__index(ky, obj)
+            FileStorage.__objects[ky] = obj
+            FileStorage.__indexed_len = len(FileStorage.__objects)
+        else:
+            FileStorage.__objects[ky] = obj
+
+    @_writes
+    def touch(self, obj, name=None):
+        """Mark obj as changed since it was last saved
+
+        name is the attribute that changed, if known; changing an
+        indexed attribute reindexes obj at once.
+        """
+        ky = "{}.{}".format(type(obj).__name__, obj.id)
+        FileStorage.__dirty.add(ky)
+        if (name in FileStorage.__indexed_attrs.get(type(obj).__name__, ())
+                and FileStorage.__objects.get(ky) is obj and
+                self.__in_sync()):
+            self.__unindex(ky, obj)
+            self.__index(ky, obj)
+
+    @_writes
+    def new_many(self, objs):
+        """Add many new objects to storage at once
+
+        The indexes are rebuilt the next time they are used instead of
+        being updated for every object.
+        """
+        for ob in objs:
+            ky = "{}.{}".format(type(ob).__name__, ob.id)
+            FileStorage.__dirty.add(ky)
+            FileStorage.__objects[ky] = ob
+        FileStorage.__indexed = None
+
+    @_writes
+    def delete(self, obj=None):
+        """Remove obj from storage if it is there"""
+        if obj is None:
+            return
+        ky = "{}.{}".format(type(obj).__name__, obj.id)
+        if ky not in FileStorage.__objects:
+            return
+        FileStorage.__dirty.add(ky)
+        if self.__in_sync():
+            self.__unindex(ky, FileStorage.__objects[ky])
+            del FileStorage.__objects[ky]
+            FileStorage.__indexed_len = len(FileStorage.__objects)
+        else:
+            del FileStorage.__objects[ky]
+
+    def query(self, cls):
+        """Get a query over the objects of class cls"""
+        return Query(self, cls)
+
+    def import_file(self, cls, fa, fmt="ndjson"):
+        """Add an object of class cls for each NDJSON or CSV row of the
+        file fa, converting values with attributes() and saving once at
+        the end; return how many"""
+        return bulk.import_rows(self, cls, bulk.read_rows(fa, fmt))
+
+    def export_file(self, cls, fa, fmt="ndjson"):
+        """Write each object of class cls as an NDJSON or CSV row of the
+        file fa; return how many"""
+        return bulk.write_rows(self, cls, fa, fmt)
+
+    def indexes(self):
+        """Get the attributes to index for different classes"""
+        indexes = {"City": ("state_id",),
+                   "Place": ("city_id", "user_id"),
+                   "Review": ("place_id", "user_id")}
+        return indexes
+
+    @staticmethod
+    def _name(cls):
+        """Get the name of cls, which may be a class or a class name"""
+        return cls if isinstance(cls, str) else cls.__name__
+
+    def __in_sync(self):
+        """Tell whether the indexes match __objects"""
+        return (FileStorage.__indexed is FileStorage.__objects and
+                FileStorage.__indexed_len == len(FileStorage.__objects))
+
+    def _reindex(self):
+        """Rebuild the indexes the next time they are used"""
+        FileStorage.__indexed = None
+
+    def _class_index(self):
+        """Get the class index, rebuilding all indexes if they are stale"""
+        if not self.__in_sync():
+            FileStorage.__by_class = {}
+            FileStorage.__by_value = {}
+            FileStorage.__values = {}
+            FileStorage.__indexed_attrs = self.indexes()
+            for ky, ob in list(FileStorage.__objects.items()):
+                self.__index(ky, ob)
+            FileStorage.__indexed = FileStorage.__objects
+            FileStorage.__indexed_len = len(FileStorage.__objects)
+        return FileStorage.__by_class
+
+    def __index(self, ky, ob):
+        """Add an object to the indexes"""
+        name = type(ob).__name__
+        FileStorage.__by_class.setdefault(name, {})[ky] = ob
+        attrs = FileStorage.__indexed_attrs.get(name)
+        if not attrs:
+            return
+        vals = tuple(getattr(ob, a, None) for a in attrs)
+        by_value = FileStorage.__by_value.setdefault(name, {})
+        for a, v in zip(attrs, vals):
+            try:
+                by_value.setdefault(a, {}).setdefault(v, {})[ky] = ob
+            except TypeError:
+                by_value.setdefault(a, {})
+        FileStorage.__values[ky] = vals
+
+    def __unindex(self, ky, ob):
+        """Remove an object from the indexes"""
+        name = type(ob).__name__
+        FileStorage.__by_class.get(name, {}).pop(ky, None)
+        vals = FileStorage.__values.pop(ky, None)
+        if vals is None:
+            return
+        by_value = FileStorage.__by_value[name]
+        for a, v in zip(FileStorage.__indexed_attrs[name], vals):
+            try:
+                bucket = by_value[a].get(v)
+            except TypeError:
+                continue
+            if bucket is not None:
+                bucket.pop(ky, None)
+                if not bucket:
+                    del by_value[a][v]
+
+    def _objects(self):
+        """Get the dictionary of objects in memory"""
+        return FileStorage.__objects
+
+    def _texts(self):
+        """Get the cached JSON text of each object, by key"""
+        return FileStorage.__texts
+
+    def _cached(self, ky, ob, tx):
+        """Keep tx as the JSON text of ob if the cache is on"""
+        if self.__cache:
+            FileStorage.__texts[ky] = (ob, tx)
+
+    def _replace(self, obs, texts):
+        """Replace the objects in memory and their texts, as a reload
+        does"""
+        FileStorage.__texts = texts
+        FileStorage.__objects = obs
+        FileStorage.__dirty.clear()
+
+    def _dirty(self):
+        """Get the keys of the objects changed since they were saved"""
+        return FileStorage.__dirty
 
     def save(self):
-        """Save objects to JSON file"""
-        with open(FileStorage.__file_path, "w", encoding="utf-8") as fa:
-            dd = {r: s.to_dict() for r, s in FileStorage.__objects.items()}
-            json.dump(dd, fa)
+        """Save objects to JSON file, or record the save for later"""
+        if self.__background:
+            self.__capture()
+        with self.__cond:
+            self.__pending += 1
+            if self.__pending == 1:
+                self.__pending_since = time.monotonic()
+            if self.__batches:
+                return
+            if self.__background and self.__worker.is_alive():
+                failed, self.__failed = self.__failed, None
+                if failed is not None:
+                    raise failed
+                if (self.__pending == 1 or
+                        self.__pending >= self.__max_dirty):
+                    self.__cond.notify()
+                return
+            if (self.__group and self.__pending < self.__max_dirty and
+                    time.monotonic() - self.__pending_since <
+                    self.__interval):
+                return
+        self.flush()
+
+    def flush(self):
+        """Write the saves that were recorded but not written yet"""
+        with self.__cond:
+            pending = self.__pending
+            self.__pending = 0
+        if pending:
+            with self.__write_lock:
+                self.__persist()
+
+    @contextmanager
+    def batch(self):
+        """Defer every save in the block to one write when it exits"""
+        with self.__cond:
+            self.__batches += 1
+        try:
+            yield self
+        finally:
+            with self.__cond:
+                self.__batches -= 1
+                done = self.__batches == 0
+            if done:
+                self.flush()
+
+    def __capture(self):
+        """Record the JSON text of the objects changed since the last
+        save, or None for those deleted, for the background writer"""
+        changes = {}
+        try:
+            with self.__holding():
+                for ky in list(FileStorage.__dirty):
+                    FileStorage.__dirty.discard(ky)
+                    ob = FileStorage.__objects.get(ky)
+                    try:
+                        changes[ky] = (None if ob is None else
+                                       (ob, json.dumps(ob.to_dict())))
+                    except BaseException:
+                        FileStorage.__dirty.add(ky)
+                        raise
+        finally:
+            with self.__cond:
+                self.__captured.update(changes)
+
+    def __persist(self):
+        """Persist the objects in memory, marking the objects that were
+        dirty again if it fails"""
+        with self.__holding(write=self._exclusive_save):
+            dirty = set(FileStorage.__dirty)
+            try:
+                self._persist()
+            except BaseException:
+                FileStorage.__dirty |= dirty
+                raise
+
+    def _persist(self):
+        """Write the changes since the last save"""
+        self._write_snapshot()
+
+    def __snapshot_loop(self):
+        """Write snapshots in the background while the store is dirty
+
+        A snapshot that fails leaves its saves pending and is tried
+        again an interval later; the error is raised by the next save().
+        """
+        with self.__cond:
+            while not self.__closed:
+                if self.__pending == 0 or self.__batches:
+                    self.__cond.wait()
+                    continue
+                due = self.__pending_since + self.__interval
+                if (self.__pending < self.__max_dirty and
+                        time.monotonic() < due):
+                    self.__cond.wait(due - time.monotonic())
+                    continue
+                pending = self.__pending
+                self.__pending = 0
+                failed = None
+                with self.__write_lock:
+                    self.__cond.release()
+                    try:
+                        self.__persist()
+                    except Exception as ee:
+                        failed = ee
+                    finally:
+                        self.__cond.acquire()
+                if failed is not None:
+                    self.__failed = failed
+                    self.__pending += pending
+                    self.__pending_since = time.monotonic()
+                    self.__cond.wait(self.__interval)
+
+    def close(self):
+        """Stop the background writer and write any pending saves"""
+        with self.__cond:
+            stop = not self.__closed
+            self.__closed = True
+            self.__cond.notify()
+        if self.__background and stop:
+            self.__worker.join()
+        self.flush()
+
+    def compact(self):
+        """Rewrite the whole store from the objects in memory"""
+        with self.__write_lock, self.__holding(write=True):
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        """Rewrite the whole JSON file from the objects in memory
+
+        Objects changed while it is written may be written in their old
+        or new state.
+        """
+        if self.__background:
+            self.__write_captured()
+            return
+        obs = dict(FileStorage.__objects)
+        texts = {}
+        self._write_json(self.__file_path, self._serialize(obs, texts),
+                         ((ky, tx) for ky, tx in self._unbuilt()
+                          if ky not in obs))
+        self._sync_dir(os.path.dirname(self.__file_path))
+        FileStorage.__texts = texts
+        self._forget_dirty()
+
+    def __write_captured(self):
+        """Rewrite the whole JSON file with the objects as they were at
+        the last save(), for background mode
+
+        Objects changed since then are written as the file last had
+        them, and objects created since then are left out.
+        """
+        with self.__cond:
+            captured, self.__captured = self.__captured, {}
+        try:
+            obs = dict(FileStorage.__objects)
+            dirty = set(FileStorage.__dirty)
+            texts = {}
+            for ky in obs.keys() | captured.keys() | dirty:
+                if ky in captured:
+                    st = captured[ky]
+                elif ky in dirty:
+                    st = FileStorage.__texts.get(ky)
+                else:
+                    st = (obs[ky], self.__text(ky, obs[ky]))
+                if st is not None:
+                    texts[ky] = st
+            self._write_json(self.__file_path,
+                             ((ky, st[1]) for ky, st in texts.items()),
+                             ((ky, tx) for ky, tx in self._unbuilt()
+                              if ky not in texts))
+        except BaseException:
+            with self.__cond:
+                captured.update(self.__captured)
+                self.__captured = captured
+            raise
+        self._sync_dir(os.path.dirname(self.__file_path))
+        FileStorage.__texts = texts
+
+    def _unbuilt(self):
+        """Get the key and JSON text of the stored objects not built yet"""
+        return ()
+
+    def _serialize(self, obs, texts):
+        """Yield the key and JSON text of each object of obs, recording
+        them in texts if the cache is on"""
+        for ky, ob in obs.items():
+            tx = self.__text(ky, ob)
+            if self.__cache:
+                texts[ky] = (ob, tx)
+            yield ky, tx
+
+    def _path(self):
+        """Get the path of the JSON file"""
+        return self.__file_path
+
+    def _write_json(self, pt, *entries):
+        """Write key and JSON text pairs as the JSON object file pt
+
+        The file is written to a temporary file that then replaces pt,
+        so a crash leaves either the old file or the new one.
+        """
+        tmp = pt + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fa:
+                sep = "{"
+                for ens in entries:
+                    for ky, tx in ens:
+                        fa.write(sep + json.dumps(ky) + ": " + tx)
+                        sep = ", "
+                fa.write("{}" if sep == "{" else "}")
+                self._sync(fa)
+            os.replace(tmp, pt)
+        except BaseException:
+            if os.path.isfile(tmp):
+                os.remove(tmp)
+            raise
+
+    def _sync(self, fa):
+        """Flush the file fa to disk if the fsync policy asks for it"""
+        if self.__fsync != "none":
+            fa.flush()
+            os.fsync(fa.fileno())
+
+    def _sync_dir(self, dr):
+        """Flush the directory dr to disk if the fsync policy asks for it"""
+        if self.__fsync != "dir":
+            return
+        fd = os.open(dr or ".", os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def __text(self, ky, ob):
+        """Get the JSON text of ob, serializing it only if it changed"""
+        st = FileStorage.__texts.get(ky)
+        if st is None or st[0] is not ob or ky in FileStorage.__dirty:
+            FileStorage.__dirty.discard(ky)
+            return json.dumps(ob.to_dict())
+        return st[1]
+
+    def _forget_dirty(self):
+        """Drop the marks of touched objects that are not stored"""
+        for ky in list(FileStorage.__dirty):
+            if ky not in FileStorage.__objects:
+                FileStorage.__dirty.discard(ky)
 
     def classes(self):
         """Get classes for different objects"""
@@ -45,15 +809,87 @@ class FileStorage:
                    "Review": Review}
         return classes
 
+    def _models(self):
+        """Get the classes to build objects from the file with"""
+        if not self.__compact:
+            return self.classes()
+        from models.compact import compact
+        return {name: compact(cl) for name, cl in self.classes().items()}
+
+    @_paused_gc()
+    @_writes
     def reload(self):
         """Reload objects from JSON file"""
-        if not os.path.isfile(FileStorage.__file_path):
-            return
-        with open(FileStorage.__file_path, "r", encoding="utf-8") as fa:
-            o_d = json.load(fa)
-            o_d = {r: self.classes()[s["__class__"]](**s)
-                   for r, s in o_d.items()}
-            FileStorage.__objects = o_d
+        with self.__cond:
+            self.__captured = {}
+        if os.path.isfile(self.__file_path):
+            self._load()
+
+    def _load(self):
+        """Build the objects in the JSON file"""
+        models = self._models()
+        obs = None
+        if self.__workers > 1:
+            obs = self.__reload_parallel(models)
+        texts = {}
+        if obs is None:
+            obs = {}
+            for ky, dd, tx in self._read():
+                ob = obs[ky] = models[dd["__class__"]](**dd)
+                if self.__cache:
+                    texts[ky] = (ob, tx)
+        self._replace(obs, texts)
+
+    def __reload_parallel(self, models):
+        """Decode the JSON file in worker processes and build its objects
+
+        The file is cut into ranges of at least 1 MB, a few per worker,
+        and the objects are built in the parent from the attributes the
+        workers send back.  Return None if the file is too small or the
+        ranges do not chain up, so that it is read the usual way.
+        """
+        pt = self.__file_path
+        size = os.path.getsize(pt)
+        n = min(self.__workers * 4, size >> 20)
+        if n < 2:
+            return None
+        cuts = [size * ix // n for ix in range(n + 1)]
+        ctx = None
+        if "fork" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("fork")
+        obs = {}
+        at = 0
+        with ProcessPoolExecutor(self.__workers, mp_context=ctx) as ex:
+            futs = [ex.submit(_load_range, pt, st, en, not self.__compact)
+                    for st, en in zip(cuts, cuts[1:])]
+            for en, fu in zip(cuts[1:], futs):
+                try:
+                    first, last, items = fu.result()
+                except (TypeError, ValueError):
+                    first, last, items = -2, None, []
+                if self.__progress is not None:
+                    self.__progress(en, size)
+                if first is None:
+                    continue
+                if first != at:
+                    for fu in futs:
+                        fu.cancel()
+                    return None
+                for ky, dd in items:
+                    cl = models[dd["__class__"]]
+                    if self.__compact:
+                        obs[ky] = cl(**dd)
+                    else:
+                        ob = obs[ky] = cl.__new__(cl)
+                        ob.__dict__.update(dd)
+                at = last
+        return obs if at == -1 else None
+
+    def _read(self, pt=None):
+        """Yield the key, attributes and JSON text of each object in the
+        JSON file, or in the file pt"""
+        with open(self.__file_path if pt is None else pt, "rb") as fa:
+            yield from _entries(fa, progress=self.__progress)
 
     def attributes(self):
         """Get attributes for different classes"""
@@ -0,0 +1,116 @@
+#!/usr/bin/python3
+"""Journal Storage Module"""
+import json
+import os
+from models.engine.file_storage import FileStorage, _paused_gc, _writes
+
+
+class JournalStorage(FileStorage):
+
+    """Journal Storage Class
+
+    save() appends a record per created, updated or deleted object to
+    "<file>.log", which is folded into the JSON file once it is larger.
+    """
+
+    def __init__(self, path=None, **kwargs):
+        """Initialize storage on path (file.json by default)"""
+        if kwargs.get("background"):
+            raise ValueError("journal storage cannot write in the "
+                             "background")
+        if not kwargs.get("cache", True):
+            raise ValueError("journal storage needs the text cache")
+        super().__init__(path, **kwargs)
+        self.__stored = {}
+
+    def __journal_path(self):
+        """Get the path of the journal file"""
+        return self._path() + ".log"
+
+    def _persist(self):
+        """Append a record for every object changed since the last save"""
+        records = []
+        obs = dict(self._objects())
+        dirty = self._dirty()
+        stored = self.__stored
+        changed = {}
+        for ky in (obs.keys() - stored.keys()) | (obs.keys() & dirty):
+            ob = obs[ky]
+            dirty.discard(ky)
+            dd = ob.to_dict()
+            tx = json.dumps(dd)
+            old = stored.get(ky)
+            changed[ky] = (ob, tx)
+            if old is None:
+                records.append({"op": "create", "key": ky, "data": dd})
+            elif old[1] != tx:
+                od = json.loads(old[1])
+                records.append({
+                    "op": "update", "key": ky,
+                    "set": {k: v for k, v in dd.items()
+                            if k not in od or od[k] != v},
+                    "unset": [k for k in od if k not in dd]})
+        gone = stored.keys() - obs.keys()
+        records.extend({"op": "delete", "key": ky} for ky in gone)
+        self._forget_dirty()
+        if records:
+            new = not os.path.isfile(self.__journal_path())
+            with open(self.__journal_path(), "a", encoding="utf-8") as fa:
+                for rc in records:
+                    fa.write(json.dumps(rc) + "\n")
+                self._sync(fa)
+                size = fa.tell()
+        stored.update(changed)
+        self._texts().update(changed)
+        for ky in gone:
+            del stored[ky]
+            self._texts().pop(ky, None)
+        if not records:
+            return
+        if new:
+            self._sync_dir(os.path.dirname(self._path()))
+        if (not os.path.isfile(self._path()) or
+                size > os.path.getsize(self._path())):
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        """Rewrite the JSON file and empty the journal"""
+        super()._write_snapshot()
+        self.__stored = dict(self._texts())
+        with open(self.__journal_path(), "w", encoding="utf-8") as fa:
+            self._sync(fa)
+
+    @_paused_gc()
+    @_writes
+    def reload(self):
+        """Reload objects from the JSON file and replay the journal"""
+        o_d = None
+        if os.path.isfile(self._path()):
+            o_d = {ky: dd for ky, dd, tx in self._read()}
+        if os.path.isfile(self.__journal_path()):
+            o_d = self.__replay({} if o_d is None else o_d)
+        if o_d is None:
+            return
+        models = self._models()
+        obs = {r: models[s["__class__"]](**s) for r, s in o_d.items()}
+        self.__stored = {r: (obs[r], json.dumps(s)) for r, s in o_d.items()}
+        self._replace(obs, dict(self.__stored))
+
+    def __replay(self, o_d):
+        """Apply the journal records to the snapshot dictionaries"""
+        with open(self.__journal_path(), "r", encoding="utf-8") as fa:
+            for ln in fa:
+                try:
+                    rc = json.loads(ln)
+                except ValueError:
+                    break
+                if rc["op"] == "create":
+                    o_d[rc["key"]] = rc["data"]
+                elif rc["op"] == "update" and rc["key"] in o_d:
+                    dd = o_d[rc["key"]]
+                    dd.update(rc["set"])
+                    for k in rc["unset"]:
+                        dd.pop(k, None)
+                elif rc["op"] == "delete":
+                    o_d.pop(rc["key"], None)
+        return o_d
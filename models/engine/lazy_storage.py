@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""Lazy Storage Module"""
+import json
+from models.engine.file_storage import (FileStorage, _paused_gc, _reads,
+                                        _writes)
+
+
+class LazyStorage(FileStorage):
+
+    """Lazy Storage Class
+
+    reload() only records the JSON text of each object, and an object is
+    built the first time all(), get() or find() reach it.
+    """
+    __raw = {}
+    __raw_for = None
+
+    def __unloaded(self):
+        """Get the JSON text of objects not built yet, by class name"""
+        if LazyStorage.__raw_for is not self._objects():
+            LazyStorage.__raw = {}
+            LazyStorage.__raw_for = self._objects()
+        return LazyStorage.__raw
+
+    def _built(self):
+        """Tell whether every object is built and indexed"""
+        return not self.__unloaded() and super()._built()
+
+    def _unbuilt(self):
+        """Get the key and JSON text of the stored objects not built yet"""
+        return [r for b in list(self.__unloaded().values())
+                for r in list(b.items())]
+
+    @_reads
+    def all(self, cls=None):
+        """Get all stored objects, or only those of class cls"""
+        self.__hydrate(None if cls is None else self._name(cls))
+        return super().all(cls)
+
+    @_reads
+    def count(self, cls=None):
+        """Count all stored objects, or only those of class cls"""
+        raw = self.__unloaded()
+        if cls is None:
+            return super().count() + sum(len(r) for r in list(raw.values()))
+        return super().count(cls) + len(raw.get(self._name(cls), {}))
+
+    @_reads
+    def get(self, cls, id):
+        """Get the object of class cls with the given id, or None"""
+        name = self._name(cls)
+        ky = "{}.{}".format(name, id)
+        tx = self.__unloaded().get(name, {}).get(ky)
+        if tx is not None:
+            self.__load(name, ky, tx)
+        return super().get(cls, id)
+
+    @_reads
+    def find(self, cls, **kwargs):
+        """Get the objects of class cls whose attributes equal kwargs"""
+        self.__hydrate(self._name(cls))
+        return super().find(cls, **kwargs)
+
+    @_writes
+    def new(self, obj):
+        """Add a new object to storage, or reindex a stored one"""
+        super().new(obj)
+        raw = self.__unloaded().get(type(obj).__name__)
+        if raw:
+            raw.pop("{}.{}".format(type(obj).__name__, obj.id), None)
+
+    @_writes
+    def new_many(self, objs):
+        """Add many new objects to storage at once"""
+        objs = list(objs)
+        super().new_many(objs)
+        raw = self.__unloaded()
+        if raw:
+            for ob in objs:
+                raw.get(type(ob).__name__, {}).pop(
+                    "{}.{}".format(type(ob).__name__, ob.id), None)
+
+    @_paused_gc()
+    def __hydrate(self, name=None):
+        """Build the objects of class name, or of all classes, not built
+
+        They go straight into the objects in memory, and the indexes are
+        rebuilt the next time they are used.
+        """
+        raw = self.__unloaded()
+        if not raw or (name is not None and name not in raw):
+            return
+        models = self._models()
+        obs = self._objects()
+        for nm in ([name] if name is not None else list(raw)):
+            for ky, tx in raw[nm].items():
+                dd = json.loads(tx)
+                ob = obs[ky] = models[dd["__class__"]](**dd)
+                self._cached(ky, ob, tx)
+            del raw[nm]
+        self._reindex()
+
+    def __load(self, name, ky, tx):
+        """Build the object stored under ky from its JSON text"""
+        dd = json.loads(tx)
+        ob = self._models()[dd["__class__"]](**dd)
+        self._cached(ky, ob, tx)
+        if "{}.{}".format(type(ob).__name__, ob.id) == ky:
+            self.new(ob)
+            self._dirty().discard(ky)
+        else:
+            self._objects()[ky] = ob
+            self.__unloaded()[name].pop(ky, None)
+
+    def _load(self):
+        """Record the JSON text of each object in the JSON file
+
+        Each value is decoded to find where its text ends, then dropped;
+        it is decoded again when its object is built.
+        """
+        raw = {}
+        for ky, dd, tx in self._read():
+            raw.setdefault(ky.partition(".")[0], {})[ky] = tx
+        self._replace({}, {})
+        LazyStorage.__raw = raw
+        LazyStorage.__raw_for = self._objects()
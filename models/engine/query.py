@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+"""Query Module"""
+from itertools import islice
+import operator
+
+_ops = {"==": operator.eq, "!=": operator.ne, "<": operator.lt,
+        "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+def _key(v, rev, conv=None):
+    """Get the sort key of the attribute value v, None sorting last
+    whether rev is set or not"""
+    if v is None:
+        return (not rev, "", 0)
+    if isinstance(v, (int, float)):
+        return (rev, "", v)
+    return (rev, type(v).__name__, v if conv is None else conv(v))
+
+
+class Query:
+
+    """Query Class
+
+    A query over the objects of one class of a storage engine, built by
+    chaining where(), order_by(), limit(), offset() and after(), each of
+    which returns a new query.  Iterating over it runs it lazily:
+    equality conditions go to storage.find(), which uses the engine's
+    indexes, and the other conditions are checked on the objects it
+    returns.  Without order_by() objects come in storage order and
+    nothing is read past the last one needed; with it every match is
+    sorted first.  An object whose attribute is missing, or cannot be
+    compared with the value, does not match the condition; order_by()
+    sorts values of different types by type rather than failing.
+    """
+
+    def __init__(self, storage, cls):
+        """Initialize a query for every object of class cls"""
+        self.__storage = storage
+        self.__cls = cls
+        self.__equal = {}
+        self.__conds = ()
+        self.__order = ()
+        self.__limit = None
+        self.__offset = 0
+        self.__after = None
+
+    def __copy(self, **changes):
+        """Get a copy of the query with some attributes changed"""
+        qr = Query(self.__storage, self.__cls)
+        qr.__dict__.update(self.__dict__)
+        for k, v in changes.items():
+            setattr(qr, "_Query__" + k, v)
+        return qr
+
+    def where(self, name=None, op="==", value=None, **kwargs):
+        """Keep the objects whose attribute name compares to value with
+        op (one of == != < <= > >=), and whose attributes equal kwargs"""
+        equal = dict(self.__equal, **kwargs)
+        conds = self.__conds
+        if name is not None:
+            if op not in _ops:
+                raise ValueError("unknown operator: " + op)
+            if op == "==":
+                equal[name] = value
+            else:
+                conds += ((name, _ops[op], value),)
+        return self.__copy(equal=equal, conds=conds)
+
+    def order_by(self, *names):
+        """Sort by attributes, a leading "-" sorting one in reverse"""
+        return self.__copy(order=self.__order + names)
+
+    def limit(self, n):
+        """Stop after n objects"""
+        return self.__copy(limit=n)
+
+    def offset(self, n):
+        """Skip the first n objects"""
+        return self.__copy(offset=n)
+
+    def after(self, cursor):
+        """Start after the object cursor, or the object whose key or id
+        is cursor, from a previous page of the same query"""
+        if not isinstance(cursor, str):
+            cursor = cursor.id
+        return self.__copy(after=cursor.rpartition(".")[2])
+
+    def __match(self, ob):
+        """Tell whether ob meets the conditions"""
+        for name, op, value in self.__conds:
+            try:
+                if not op(getattr(ob, name), value):
+                    return False
+            except (AttributeError, TypeError):
+                return False
+        return True
+
+    def __sorted(self, obs):
+        """Sort obs by the order_by() attributes, then by id, with
+        missing attributes last
+
+        Values of different types are grouped by type, numbers together,
+        and values that still cannot be compared by their repr().
+        """
+        obs = sorted(obs, key=lambda ob: ob.id)
+        for name in reversed(self.__order):
+            at = name.lstrip("-")
+            rev = name.startswith("-")
+            try:
+                obs = sorted(obs, key=lambda ob: _key(
+                    getattr(ob, at, None), rev), reverse=rev)
+            except TypeError:
+                obs = sorted(obs, key=lambda ob: _key(
+                    getattr(ob, at, None), rev, repr), reverse=rev)
+        return obs
+
+    def __iter__(self):
+        """Run the query"""
+        if self.__equal:
+            found = self.__storage.find(self.__cls, **self.__equal)
+        else:
+            found = self.__storage.all(self.__cls)
+        obs = (ob for ob in found.values() if self.__match(ob))
+        if self.__order:
+            obs = iter(self.__sorted(obs))
+        if self.__after is not None:
+            for ob in obs:
+                if ob.id == self.__after:
+                    break
+        stop = None if self.__limit is None else self.__offset + self.__limit
+        return islice(obs, self.__offset, stop)
+
+    def first(self):
+        """Get the first object, or None"""
+        return next(iter(self.limit(1)), None)
+
+    def count(self):
+        """Count the objects"""
+        return sum(1 for ob in self)
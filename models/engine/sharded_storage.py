@@ -0,0 +1,190 @@
+#!/usr/bin/python3
+"""Sharded Storage Module"""
+import os
+import re
+import zlib
+from models.engine.file_storage import (FileStorage, _paused_gc, _reads,
+                                        _writes)
+
+_shard_file = re.compile(r"([A-Za-z_][A-Za-z0-9_]*)(?:\.[0-9]+)?\.json")
+
+
+class ShardedStorage(FileStorage):
+
+    """Sharded Storage Class
+
+    Objects are kept in a directory named after the file (file.shards)
+    with one JSON file per class, or n files split by a hash of the id
+    for a class mapped to n in shards; save() only rewrites the files
+    whose objects changed, and a class is read when it is first used.
+    """
+
+    def __init__(self, path=None, shards=None, **kwargs):
+        """Initialize storage on the shards of path (file.json by
+        default)"""
+        if kwargs.get("background"):
+            raise ValueError("sharded storage cannot write in the "
+                             "background")
+        super().__init__(path, **kwargs)
+        self.__shards = {} if shards is None else shards
+        self.__shard_dir = os.path.splitext(self._path())[0] + ".shards"
+        self.__shard_keys = {}
+        self.__stale = set()
+        self.__unread = set()
+
+    def _built(self):
+        """Tell whether every class is read and indexed"""
+        return not self.__unread and super()._built()
+
+    @_reads
+    def all(self, cls=None):
+        """Get all stored objects, or only those of class cls"""
+        self.__need(None if cls is None else self._name(cls))
+        return super().all(cls)
+
+    @_reads
+    def count(self, cls=None):
+        """Count all stored objects, or only those of class cls"""
+        self.__need(None if cls is None else self._name(cls))
+        return super().count(cls)
+
+    @_reads
+    def get(self, cls, id):
+        """Get the object of class cls with the given id, or None"""
+        self.__need(self._name(cls))
+        return super().get(cls, id)
+
+    @_reads
+    def find(self, cls, **kwargs):
+        """Get the objects of class cls whose attributes equal kwargs"""
+        self.__need(self._name(cls))
+        return super().find(cls, **kwargs)
+
+    @_writes
+    def new(self, obj):
+        """Add a new object to storage, or reindex a stored one"""
+        self.__need(type(obj).__name__)
+        super().new(obj)
+
+    @_writes
+    def new_many(self, objs):
+        """Add many new objects to storage at once"""
+        objs = list(objs)
+        for ob in objs:
+            self.__need(type(ob).__name__)
+        super().new_many(objs)
+
+    def __shard(self, ky):
+        """Get the name of the shard file that holds the object key ky"""
+        name, dot, id = ky.partition(".")
+        n = self.__shards.get(name)
+        if not n:
+            return name + ".json"
+        return "{}.{}.json".format(name, zlib.crc32(id.encode("utf-8")) % n)
+
+    def _persist(self):
+        """Rewrite the shard files whose objects changed since last saved
+
+        A class is skipped without looking at its objects when none of
+        them was touched and its count did not change.
+        """
+        os.makedirs(self.__shard_dir, exist_ok=True)
+        dirty = {}
+        for ky in list(self._dirty()):
+            dirty.setdefault(ky.partition(".")[0], set()).add(ky)
+        by_class = self._class_index()
+        texts = {}
+        gone = set()
+        for name in self.classes():
+            if name in self.__unread:
+                continue
+            cur = dict(by_class.get(name, {}))
+            old = self.__shard_keys.get(name, {})
+            dk = dirty.get(name, set())
+            if (not dk and name not in self.__stale and
+                    len(cur) == sum(len(v) for v in old.values())):
+                continue
+            written = set().union(*old.values())
+            gone |= written - cur.keys()
+            if name in self.__stale:
+                files, old = old, {}
+                moved = cur.keys()
+            else:
+                files = {}
+                moved = dk | (cur.keys() - written) | (written - cur.keys())
+            adds = {}
+            for ky in moved:
+                adds.setdefault(self.__shard(ky), set()).add(ky)
+            for fn, kys in adds.items():
+                members = (old.get(fn, set()) | kys) & cur.keys()
+                pt = os.path.join(self.__shard_dir, fn)
+                if members:
+                    self._write_json(pt, self._serialize(
+                        {ky: cur[ky] for ky in sorted(members)}, texts))
+                    old[fn] = members
+                else:
+                    if os.path.isfile(pt):
+                        os.remove(pt)
+                    old.pop(fn, None)
+            for fn in files:
+                if fn not in old:
+                    os.remove(os.path.join(self.__shard_dir, fn))
+            self.__shard_keys[name] = old
+            self.__stale.discard(name)
+        self._sync_dir(self.__shard_dir)
+        self._texts().update(texts)
+        for ky in gone:
+            self._texts().pop(ky, None)
+        self._forget_dirty()
+
+    def _write_snapshot(self):
+        """Rewrite every shard file"""
+        self.__need()
+        self.__stale.update(self.classes())
+        self._persist()
+
+    @_paused_gc()
+    @_writes
+    def reload(self, names=None):
+        """Reload objects from the shard files
+
+        names limits the reload to the classes it names; the others are
+        read the first time they are used.
+        """
+        self._replace({}, {})
+        self.__shard_keys = {}
+        self.__stale = set()
+        self.__unread = set(self.classes())
+        for name in list(self.classes() if names is None else names):
+            self.__read_shards(name)
+
+    def __read_shards(self, name):
+        """Read the shard files of class name"""
+        self.__unread.discard(name)
+        files = []
+        if os.path.isdir(self.__shard_dir):
+            files = sorted(fn for fn in os.listdir(self.__shard_dir)
+                           if _shard_file.fullmatch(fn) and
+                           _shard_file.fullmatch(fn).group(1) == name)
+        models = self._models()
+        obs = self._objects()
+        shards = {}
+        for fn in files:
+            kys = shards[fn] = set()
+            for ky, dd, tx in self._read(os.path.join(self.__shard_dir, fn)):
+                ob = obs[ky] = models[dd["__class__"]](**dd)
+                self._cached(ky, ob, tx)
+                kys.add(ky)
+                if self.__shard(ky) != fn:
+                    self.__stale.add(name)
+        self._reindex()
+        self.__shard_keys[name] = shards
+
+    def __need(self, name=None):
+        """Read the shards of class name, or of all classes, if they were
+        not read yet"""
+        if not self.__unread:
+            return
+        for nm in [name] if name is not None else list(self.__unread):
+            if nm in self.__unread:
+                self.__read_shards(nm)
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""Shared Storage Module"""
+from contextlib import contextmanager
+import os
+from models.engine.file_storage import FileStorage, _paused_gc, _writes
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class SharedStorage(FileStorage):
+
+    """Shared Storage Class
+
+    Several processes can use the same JSON file: a save holds the lock
+    on "<file>.lock" and first takes in what the others saved since.
+    """
+    _exclusive_save = True
+
+    def __init__(self, path=None, **kwargs):
+        """Initialize storage on path (file.json by default)"""
+        if fcntl is None:
+            raise ValueError("shared storage needs fcntl")
+        if kwargs.get("background"):
+            raise ValueError("shared storage cannot write in the "
+                             "background")
+        if not kwargs.get("cache", True):
+            raise ValueError("shared storage needs the text cache")
+        if kwargs.get("workers", 0) > 1:
+            raise ValueError("shared storage reads the file in one "
+                             "process")
+        super().__init__(path, **kwargs)
+        self.__seen = None
+        self.__base = {}
+
+    @contextmanager
+    def __file_lock(self, exclusive=False):
+        """Hold the advisory lock on the "<file>.lock" file"""
+        with open(self._path() + ".lock", "a") as fa:
+            fcntl.flock(fa.fileno(),
+                        fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(fa.fileno(), fcntl.LOCK_UN)
+
+    def __signature(self):
+        """Get what tells one version of the JSON file from another, or
+        None if there is no file"""
+        try:
+            st = os.stat(self._path())
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def __hashes(self):
+        """Get the hash of the cached JSON text of each object"""
+        return {ky: hash(st[1]) for ky, st in self._texts().items()}
+
+    def __ours(self, ky):
+        """Tell whether the object key ky changed here since the JSON file
+        was last read or written"""
+        return (ky in self._dirty() or
+                (ky in self._objects()) != (ky in self.__base))
+
+    def __merge(self):
+        """Take in the objects other processes saved since the JSON file
+        was last read or written, and return how many changed
+
+        Only the objects whose text changed are built again, and an
+        object changed both here and in the file keeps the version made
+        here.
+        """
+        sig = self.__signature()
+        if sig == self.__seen:
+            return 0
+        base = self.__base
+        models = self._models()
+        theirs = {}
+        n = 0
+        for ky, dd, tx in (self._read() if sig is not None else ()):
+            theirs[ky] = hash(tx)
+            if base.get(ky) == theirs[ky] or self.__ours(ky):
+                continue
+            ob = models[dd["__class__"]](**dd)
+            self.new(ob)
+            self._dirty().discard(ky)
+            self._cached(ky, ob, tx)
+            n += 1
+        for ky in base.keys() - theirs.keys():
+            if ky in self._objects() and not self.__ours(ky):
+                self.delete(self._objects()[ky])
+                self._dirty().discard(ky)
+                self._texts().pop(ky, None)
+                n += 1
+        self.__base = theirs
+        self.__seen = sig
+        return n
+
+    @_writes
+    def refresh(self):
+        """Take in the objects other processes saved, and return how many
+        were added, changed or removed"""
+        with self.__file_lock():
+            return self.__merge()
+
+    def _write_snapshot(self):
+        """Merge in the changes of other processes, then rewrite the JSON
+        file, under the file lock"""
+        with self.__file_lock(exclusive=True):
+            self.__merge()
+            super()._write_snapshot()
+            self.__base = self.__hashes()
+            self.__seen = self.__signature()
+
+    @_paused_gc()
+    @_writes
+    def reload(self):
+        """Reload objects from the JSON file, under the file lock"""
+        with self.__file_lock():
+            self.__seen = self.__signature()
+            super().reload()
+            self.__base = {} if self.__seen is None else self.__hashes()
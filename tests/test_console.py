@@ -1,11 +1,15 @@
 #!/usr/bin/python3
 """Test cases for HBNBCommand prompt behavior."""
+import json
 import os
+import shutil
 import sys
+import tempfile
 import unittest
 from models import storage
 from models.engine.file_storage import FileStorage
 from console import HBNBCommand
+from models.place import Place
 from io import StringIO
 from unittest.mock import patch
 
@@ -63,7 +67,8 @@ class TestHBNBCommand_help(unittest.TestCase):
         n = ("Usage: all or all <class> or <class>.all()\n        "
              "Display string representations of all instances of a given class"
              ".\n        If no class is specified, displays all instantiated "
-             "objects.")
+             "objects.\n        Options: --limit <n> to stop after n, "
+             "--ndjson for one JSON per line.")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help all"))
             self.assertEqual(n, output.getvalue().strip())
@@ -88,7 +93,8 @@ class TestHBNBCommand_help(unittest.TestCase):
     def test_help_general_command(self):
         n = ("Documented commands (type help <topic>):\n"
              "========================================\n"
-             "EOF  all  count  create  destroy  help  quit  show  update")
+             "EOF  begin   count   destroy  help    quit  update\n"
+             "all  commit  create  export   import  show")
         with patch("sys.stdout", new=StringIO()) as output:
             self.assertFalse(HBNBCommand().onecmd("help"))
             self.assertEqual(n, output.getvalue().strip())
@@ -840,6 +846,38 @@ class TestHBNBCommand_all(unittest.TestCase):
             self.assertIn("Review", outp.getvalue().strip())
             self.assertNotIn("BaseModel", outp.getvalue().strip())
 
+    def test_all_command_streams_list(self):
+        FileStorage._FileStorage__objects = {}
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd("all"))
+            self.assertEqual("[]\n", outp.getvalue())
+        for ii in range(3):
+            with patch("sys.stdout", new=StringIO()):
+                HBNBCommand().onecmd("create Place")
+        obs = list(storage.all("Place").values())
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd("all Place"))
+            self.assertEqual(str([str(ob) for ob in obs]) + "\n",
+                             outp.getvalue())
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd("Place.all(--limit 2)"))
+            self.assertEqual(str([str(ob) for ob in obs[:2]]) + "\n",
+                             outp.getvalue())
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd("all --ndjson Place"))
+            self.assertEqual([json.loads(ln) for ln in
+                              outp.getvalue().splitlines()],
+                             [ob.to_dict() for ob in obs])
+        FileStorage._FileStorage__objects = {}
+
+    def test_all_command_bad_options(self):
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd("all --limit x"))
+            self.assertEqual("** invalid limit **", outp.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd("all --csv"))
+            self.assertEqual("** invalid option **", outp.getvalue().strip())
+
 
 class TestUpdateCommand(unittest.TestCase):
     """Test cases for the update command."""
@@ -1479,6 +1517,89 @@ class TestUpdateCommand(unittest.TestCase):
         test_di = storage.all()["Place.{}".format(testId)].__dict__
         self.assertEqual(9.8, test_di["latitude"])
 
+    def test_update_values_are_not_evaluated(self):
+        with patch("sys.stdout", new=StringIO()) as outp:
+            HBNBCommand().onecmd("create Place")
+            testId = outp.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()) as outp, \
+                patch("os.getcwd") as cwd:
+            HBNBCommand().onecmd(
+                "update Place {} __import__('os').getcwd()".format(testId))
+            self.assertEqual("** value missing **", outp.getvalue().strip())
+        cwd.assert_not_called()
+
+    def test_update_typed_values(self):
+        with patch("sys.stdout", new=StringIO()) as outp:
+            HBNBCommand().onecmd("create Place")
+            testId = outp.getvalue().strip()
+        ob = storage.get("Place", testId)
+        HBNBCommand().onecmd(
+            'update Place {} amenity_ids ["a1", "a2"]'.format(testId))
+        self.assertEqual(["a1", "a2"], ob.amenity_ids)
+        HBNBCommand().onecmd(
+            "update Place {} updated_at 2020-01-02T03:04:05".format(testId))
+        self.assertEqual(2020, ob.updated_at.year)
+        HBNBCommand().onecmd('Place.update({}, {{"name": 5, "rank": [1]}})'
+                             .format(testId))
+        self.assertEqual("5", ob.name)
+        self.assertEqual([1], ob.rank)
+        with patch("sys.stdout", new=StringIO()) as outp:
+            HBNBCommand().onecmd(
+                "update Place {} max_guest many".format(testId))
+            self.assertEqual("** invalid value **", outp.getvalue().strip())
+        self.assertEqual(0, ob.max_guest)
+
+    def test_update_values_not_stored_as_json(self):
+        with patch("sys.stdout", new=StringIO()) as outp:
+            HBNBCommand().onecmd("create Place")
+            testId = outp.getvalue().strip()
+        ob = storage.get("Place", testId)
+        for testCmd in ["update Place {} {{'raw': b'xy'}}",
+                        "update Place {} {{'num': 3j}}",
+                        "update Place {} {{'pair': (1, 2)}}",
+                        "update Place {} amenity_ids {{'a': 1}}",
+                        "update Place {} {{'max_guest': [4]}}"]:
+            with patch("sys.stdout", new=StringIO()) as outp:
+                HBNBCommand().onecmd(testCmd.format(testId))
+                self.assertEqual("** invalid value **",
+                                 outp.getvalue().strip())
+        for name in ("raw", "num", "pair"):
+            self.assertNotIn(name, ob.__dict__)
+        self.assertEqual([], ob.amenity_ids)
+        self.assertEqual(0, ob.max_guest)
+
+    def test_update_spaces_before_quoted_value(self):
+        with patch("sys.stdout", new=StringIO()) as outp:
+            HBNBCommand().onecmd("create User")
+            testId = outp.getvalue().strip()
+        HBNBCommand().onecmd(
+            'update User {} first_name{}"Betty"'.format(testId, " " * 40))
+        self.assertEqual("Betty", storage.get("User", testId).first_name)
+
+    def test_update_reserved_attributes(self):
+        with patch("sys.stdout", new=StringIO()) as outp:
+            HBNBCommand().onecmd("create Place")
+            testId = outp.getvalue().strip()
+        ob = storage.get("Place", testId)
+        created = ob.created_at
+        for testCmd in ["update Place {} __class__ Foo",
+                        'Place.update({}, {{"__class__": "x"}})',
+                        "update Place {} id 1234",
+                        'Place.update({}, {{"name": "a", "id": "b"}})',
+                        "Place.update({}, {{1: 2}})"]:
+            with patch("sys.stdout", new=StringIO()) as outp:
+                HBNBCommand().onecmd(testCmd.format(testId))
+                self.assertEqual("** attribute can't be updated **",
+                                 outp.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as outp:
+            HBNBCommand().onecmd(
+                "update Place {} created_at yesterday".format(testId))
+            self.assertEqual("** invalid value **", outp.getvalue().strip())
+        self.assertIs(Place, type(ob))
+        self.assertEqual(testId, ob.id)
+        self.assertEqual(created, ob.created_at)
+        self.assertEqual("", ob.name)
+
     def test_update_latitude_float_value_comma(self):
         with patch("sys.stdout", new=StringIO()) as outp:
             HBNBCommand().onecmd("create Place")
@@ -1514,9 +1635,23 @@ class TestCountCommand(unittest.TestCase):
 
     def test_count_no_objects(self):
         with patch("sys.stdout", new=StringIO()) as outp:
-            self.assertFalse(HBNBCommand().onecmd("MyModel.count()"))
+            self.assertFalse(HBNBCommand().onecmd("Review.count()"))
             self.assertEqual("0", outp.getvalue().strip())
 
+    def test_count_missing_or_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd("count"))
+            self.assertEqual("** class name missing **",
+                             outp.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd("MyModel.count()"))
+            self.assertEqual("** class doesn't exist **",
+                             outp.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd("count Foo"))
+            self.assertEqual("** class doesn't exist **",
+                             outp.getvalue().strip())
+
     def test_count_single_object_per_class(self):
         with patch("sys.stdout", new=StringIO()) as outp:
             self.assertFalse(HBNBCommand().onecmd("create BaseModel"))
@@ -1555,5 +1690,191 @@ class TestCountCommand(unittest.TestCase):
             self.assertEqual("1", outp.getvalue().strip())
 
 
+class TestQueryCommand(unittest.TestCase):
+    """Test cases for the query syntax"""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.pls = []
+        for ii in range(5):
+            with patch("sys.stdout", new=StringIO()) as outp:
+                HBNBCommand().onecmd("create Place")
+            pl = storage.get("Place", outp.getvalue().strip())
+            pl.price_by_night = 50 * ii
+            pl.name = "place {}".format(ii)
+            self.pls.append(pl)
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def run_query(self, line):
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd(line))
+        return outp.getvalue().strip()
+
+    def test_where_limit(self):
+        self.assertEqual(
+            self.run_query("Place.where(price_by_night<100).limit(20)"),
+            str([str(pl) for pl in self.pls[:2]]))
+        self.assertEqual(
+            self.run_query('Place.where(name="place 3", '
+                           'price_by_night >= 100)'),
+            str([str(self.pls[3])]))
+        self.pls[4].name = "a,b (c)"
+        self.assertEqual(
+            self.run_query('Place.where(name="a,b (c)")'),
+            str([str(self.pls[4])]))
+
+    def test_order_offset_after(self):
+        self.assertEqual(
+            self.run_query("Place.order_by(-price_by_night).offset(1)"
+                           ".limit(2)"),
+            str([str(pl) for pl in self.pls[3:1:-1]]))
+        self.assertEqual(
+            self.run_query("Place.order_by(price_by_night).after({})"
+                           .format(self.pls[2].id)),
+            str([str(pl) for pl in self.pls[3:]]))
+
+    def test_errors(self):
+        self.assertEqual(self.run_query("MyModel.where(a=1)"),
+                         "** class doesn't exist **")
+        self.assertEqual(self.run_query("Place.where(a~1)"),
+                         "*** bad condition: a~1")
+        self.assertEqual(self.run_query("Place.limit(a)"),
+                         "*** invalid literal for int() with base 10: 'a'")
+
+
+class TestBatchCommand(unittest.TestCase):
+    """Test cases for running commands as a batch"""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_begin_commit(self):
+        cmd = HBNBCommand()
+        with patch.object(storage, "_FileStorage__persist") as ps:
+            with patch("sys.stdout", new=StringIO()):
+                cmd.onecmd("begin")
+                for ii in range(3):
+                    cmd.postcmd(cmd.onecmd("create User"), "create User")
+            self.assertEqual(ps.call_count, 0)
+            self.assertEqual(storage.count("User"), 3)
+            with patch("sys.stderr", new=StringIO()) as errp:
+                cmd.onecmd("commit")
+            self.assertEqual(ps.call_count, 1)
+        self.assertRegex(errp.getvalue(),
+                         r"^3 commands in [0-9.]+ s \([0-9]+ commands/s\)")
+
+    def test_run_batch_every(self):
+        lines = ["create Place\n"] * 5 + ["\n"]
+        with patch.object(storage, "_FileStorage__persist") as ps:
+            with patch("sys.stdout", new=StringIO()) as outp, \
+                    patch("sys.stderr", new=StringIO()) as errp:
+                HBNBCommand().run_batch(lines, 2)
+        self.assertEqual(ps.call_count, 3)
+        self.assertEqual(len(outp.getvalue().split()), 5)
+        self.assertTrue(errp.getvalue().startswith("5 commands in "))
+
+    def test_errors(self):
+        cmd = HBNBCommand()
+        with patch("sys.stdout", new=StringIO()) as outp:
+            cmd.onecmd("commit")
+            cmd.onecmd("begin x")
+            cmd.onecmd("begin")
+            cmd.onecmd("begin")
+        self.assertEqual(outp.getvalue().split("\n")[:3],
+                         ["** no batch begun **", "** invalid number **",
+                          "** batch already begun **"])
+        with patch("sys.stderr", new=StringIO()):
+            cmd.postloop()
+        with patch("sys.stdout", new=StringIO()) as outp:
+            cmd.onecmd("commit")
+        self.assertEqual(outp.getvalue().strip(), "** no batch begun **")
+
+
+class TestImportExportCommand(unittest.TestCase):
+    """Test cases for the import and export commands"""
+
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.dr = tempfile.mkdtemp()
+
+    def tearDown(self):
+        FileStorage._FileStorage__objects = {}
+        shutil.rmtree(self.dr)
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def run_cmd(self, line):
+        with patch("sys.stdout", new=StringIO()) as outp:
+            self.assertFalse(HBNBCommand().onecmd(line))
+        return outp.getvalue().strip()
+
+    def test_round_trip(self):
+        for ext in ("ndjson", "csv"):
+            FileStorage._FileStorage__objects = {}
+            pt = os.path.join(self.dr, "places." + ext)
+            pl = Place()
+            pl.number_rooms = 3
+            pl.amenity_ids = ["a1"]
+            self.assertEqual(self.run_cmd("export Place " + pt), "1")
+            FileStorage._FileStorage__objects = {}
+            self.assertEqual(self.run_cmd("import Place " + pt), "1")
+            self.assertEqual(storage.get("Place", pl.id).to_dict(),
+                             pl.to_dict())
+
+    def test_errors(self):
+        pt = os.path.join(self.dr, "bad.ndjson")
+        with open(pt, "w") as fa:
+            fa.write('{"name": "a"}\n{"__class__": "User"}\n')
+        self.assertEqual(self.run_cmd("import"),
+                         "** class name missing **")
+        self.assertEqual(self.run_cmd("import MyModel x"),
+                         "** class doesn't exist **")
+        self.assertEqual(self.run_cmd("export Place"),
+                         "** file name missing **")
+        self.assertEqual(self.run_cmd("import Place " + pt + ".x"),
+                         "** no such file or directory **")
+        self.assertEqual(self.run_cmd("import Place " + pt),
+                         "*** row 2: row of class User")
+
+
 if __name__ == "__main__":
     unittest.main()
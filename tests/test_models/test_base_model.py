@@ -158,6 +158,17 @@ class TestBaseModelMethods(unittest.TestCase):
         oo = BaseModel(**dd)
         self.assertEqual(oo.to_dict(), dd)
 
+    def test_create_from_dict_timestamps(self):
+        """Test timestamps with any number of microsecond digits"""
+        dd = {"__class__": "BaseModel", "id": "1",
+              "created_at": "2050-12-30T23:59:59",
+              "updated_at": "2050-12-30T23:59:59.5"}
+        oo = BaseModel(**dd)
+        self.assertEqual(oo.created_at, datetime(2050, 12, 30, 23, 59, 59))
+        self.assertEqual(oo.updated_at.microsecond, 500000)
+        with self.assertRaises(ValueError):
+            BaseModel(**dict(dd, updated_at="not a date"))
+
     def test_save_to_file(self):
         """Test saving BaseModel instance to file"""
         self.resetStorage()
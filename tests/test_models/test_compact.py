@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+"""Unit tests for the compact model classes."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from console import HBNBCommand
+from models import storage
+from models.compact import compact
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.user import User
+
+
+class TestCompact(unittest.TestCase):
+
+    """Tests for models whose attributes live in slots."""
+
+    def tearDown(self):
+        """Reset the storage."""
+        FileStorage._FileStorage__objects = {}
+
+    def test_class(self):
+        """The compact class is a cached subclass with the same name."""
+        cl = compact(Place)
+        self.assertIs(compact(Place), cl)
+        self.assertTrue(issubclass(cl, Place))
+        self.assertEqual(cl.__name__, "Place")
+        self.assertIn("price_by_night", cl.__slots__)
+
+    def test_round_trip(self):
+        """An object built from to_dict() gives back the same dict."""
+        pl = Place()
+        pl.name = "Loft"
+        pl.number_rooms = 3
+        dd = pl.to_dict()
+        cp = compact(Place)(**dd)
+        self.assertEqual(cp.to_dict(), dd)
+        self.assertEqual(str(cp), str(pl))
+        self.assertEqual(cp.created_at, pl.created_at)
+
+    def test_foreign_keys_shared(self):
+        """Equal foreign keys read from dicts are the same string."""
+        dd = Place().to_dict()
+        dd["city_id"] = "".join(["c", "1"])
+        c1 = compact(Place)(**dd)
+        dd["city_id"] = "".join(["c", "1"])
+        c2 = compact(Place)(**dd)
+        self.assertIs(c1.city_id, c2.city_id)
+
+    def test_defaults_and_extra(self):
+        """Unset slots read as class defaults, others go to overflow."""
+        cp = compact(User)(**User().to_dict())
+        self.assertEqual(cp.email, "")
+        cp.nickname = "bob"
+        cp.email = "a@b.c"
+        self.assertEqual(cp.nickname, "bob")
+        self.assertEqual(cp.to_dict()["nickname"], "bob")
+        self.assertIn("'email': 'a@b.c'", str(cp))
+        del cp.nickname
+        self.assertNotIn("nickname", cp.to_dict())
+        with self.assertRaises(AttributeError):
+            cp.nickname
+
+    def test_new_object(self):
+        """A compact object created from nothing is stored."""
+        cp = compact(Place)()
+        self.assertIs(storage.get(Place, cp.id), cp)
+        self.assertEqual(cp.to_dict()["__class__"], "Place")
+
+    def test_console_update(self):
+        """The console updates schema and extra attributes."""
+        cp = compact(Place)(**Place().to_dict())
+        storage.new(cp)
+        cmd = HBNBCommand()
+        cmd.onecmd('update Place {} number_rooms "4"'.format(cp.id))
+        cmd.onecmd('update Place {} color "red"'.format(cp.id))
+        self.assertEqual(cp.number_rooms, 4)
+        self.assertEqual(cp.color, "red")
+        if os.path.isfile("file.json"):
+            os.remove("file.json")
+
+    def test_storage_reload(self):
+        """A compact FileStorage builds compact objects from the file."""
+        dr = tempfile.mkdtemp()
+        try:
+            pt = os.path.join(dr, "file.json")
+            pl = Place()
+            pl.name = "Loft"
+            FileStorage(pt).save()
+            FileStorage._FileStorage__objects = {}
+            fs = FileStorage(pt, compact=True)
+            fs.reload()
+            cp = fs.get(Place, pl.id)
+            self.assertIs(type(cp), compact(Place))
+            self.assertEqual(cp.to_dict(), pl.to_dict())
+            cp.name = "Barn"
+            fs.save()
+            with open(pt, "r", encoding="utf-8") as fa:
+                dd = json.load(fa)
+            self.assertEqual(dd["Place." + pl.id]["name"], "Barn")
+        finally:
+            shutil.rmtree(dr)
+
+
+if __name__ == "__main__":
+    unittest.main()
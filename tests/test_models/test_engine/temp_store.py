@@ -0,0 +1,27 @@
+#!/usr/bin/python3
+"""
+Base test case for tests that need an empty store.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from models.engine.file_storage import FileStorage
+
+
+class TempStoreTestCase(unittest.TestCase):
+    """Base for tests on an empty store in a temporary directory.
+
+    self.dr is the directory and self.pt the JSON file in it.
+    """
+
+    def setUp(self):
+        """Use an empty store in a temporary directory."""
+        FileStorage._FileStorage__objects = {}
+        self.dr = tempfile.mkdtemp()
+        self.pt = os.path.join(self.dr, "file.json")
+
+    def tearDown(self):
+        """Remove the temporary directory and reset the store."""
+        FileStorage._FileStorage__objects = {}
+        shutil.rmtree(self.dr)
@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+Unit tests for the AsyncStorage class.
+"""
+import json
+import os
+import threading
+import unittest
+from unittest.mock import patch
+from models import storage
+from models.base_model import BaseModel
+from models.engine.async_storage import AsyncStorage
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from tests.test_models.test_engine.temp_store import TempStoreTestCase
+
+
+class test_asyncStorage(TempStoreTestCase,
+                        unittest.IsolatedAsyncioTestCase):
+    """Tests for the async facade over a FileStorage."""
+
+    def setUp(self):
+        """Wrap a store in a temporary directory."""
+        super().setUp()
+        self.fs = FileStorage(self.pt)
+        self.st = AsyncStorage(self.fs, chunk=2)
+
+    async def asyncTearDown(self):
+        """Stop the worker thread."""
+        await self.st.aclose()
+
+    def test_default_storage(self):
+        """The facade wraps the models.storage singleton by default."""
+        self.assertIs(AsyncStorage().storage, storage)
+
+    async def test_save_and_reload(self):
+        """asave() writes the file off the event loop thread and
+        areload() reads it back into the shared objects."""
+        bb = BaseModel()
+        threads = []
+        save = self.fs.save
+
+        def recorded():
+            threads.append(threading.current_thread())
+            save()
+        with patch.object(self.fs, "save", recorded):
+            await self.st.asave()
+        self.assertIsNot(threads[0], threading.current_thread())
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            self.assertIn("BaseModel." + bb.id, json.load(fa))
+        FileStorage._FileStorage__objects = {}
+        await self.st.areload()
+        self.assertEqual(self.fs.get(BaseModel, bb.id).to_dict(),
+                         bb.to_dict())
+
+    async def test_reads(self):
+        """The async reads see the objects of the sync API."""
+        pl = Place()
+        pl.city_id = "c1"
+        bb = BaseModel()
+        self.assertIs(await self.st.aget(Place, pl.id), pl)
+        self.assertEqual(await self.st.acount(), 2)
+        self.assertEqual(list(await self.st.aall(Place)),
+                         ["Place." + pl.id])
+        self.assertEqual(list(await self.st.afind(Place, city_id="c1")),
+                         ["Place." + pl.id])
+        await self.st.adelete(bb)
+        self.assertIsNone(self.fs.get(BaseModel, bb.id))
+        await self.st.anew(bb)
+        self.assertIs(self.fs.get(BaseModel, bb.id), bb)
+
+    async def test_iteration(self):
+        """Async iteration yields every object of a class, or all."""
+        pls = [Place() for ii in range(5)]
+        BaseModel()
+        self.assertEqual([ob async for ob in self.st.aiter(Place)], pls)
+        self.assertEqual(len([ob async for ob in self.st]), 6)
+
+
+class test_asyncStorage_db(TempStoreTestCase,
+                           unittest.IsolatedAsyncioTestCase):
+    """Tests for the async facade over a DBStorage."""
+
+    def setUp(self):
+        """Open a database in a temporary directory."""
+        super().setUp()
+        self.db = DBStorage(os.path.join(self.dr, "file.db"))
+        self.db.reload()
+
+    def tearDown(self):
+        """Close the database."""
+        self.db.close()
+        super().tearDown()
+
+    async def test_other_thread(self):
+        """The database can be used from the worker thread."""
+        st = AsyncStorage(self.db)
+        pl = Place()
+        await st.anew(pl)
+        await st.asave()
+        self.assertEqual((await st.aget(Place, pl.id)).id, pl.id)
+        await st.aclose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/python3
+"""
+Unit tests for bulk import and export.
+"""
+import io
+import json
+import unittest
+from unittest.mock import patch
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+
+
+class test_bulk(unittest.TestCase):
+    """Tests for importing and exporting NDJSON and CSV."""
+
+    def setUp(self):
+        """Use an empty store."""
+        FileStorage._FileStorage__objects = {}
+        self.fs = FileStorage()
+
+    def tearDown(self):
+        """Reset the store."""
+        FileStorage._FileStorage__objects = {}
+
+    def imported(self, text, fmt, cls=Place):
+        """Import text without writing the JSON file, and get the
+        number of rows and of writes."""
+        with patch.object(self.fs, "_FileStorage__persist") as ps:
+            n = self.fs.import_file(cls, io.StringIO(text), fmt)
+        return n, ps.call_count
+
+    def test_csv_types(self):
+        """CSV cells are converted to the types of attributes()."""
+        text = ("id,number_rooms,latitude,amenity_ids,max_guest,color\n"
+                'p1,3,1.5,"[""a1""]",,red\n')
+        self.assertEqual(self.imported(text, "csv"), (1, 1))
+        pl = self.fs.get(Place, "p1")
+        self.assertEqual(pl.number_rooms, 3)
+        self.assertEqual(pl.latitude, 1.5)
+        self.assertEqual(pl.amenity_ids, ["a1"])
+        self.assertEqual(pl.max_guest, 0)
+        self.assertNotIn("max_guest", pl.__dict__)
+        self.assertEqual(pl.color, "red")
+        self.assertEqual(type(pl.created_at).__name__, "datetime")
+
+    def test_ndjson_bulk(self):
+        """Rows are added through new_many() a chunk at a time and
+        saved once."""
+        text = "".join(json.dumps({"text": str(ii), "user_id": "u1"}) + "\n"
+                       for ii in range(25)) + "\n"
+        with patch("models.engine.bulk.import_rows.__defaults__", (10,)), \
+                patch.object(self.fs, "new_many",
+                             wraps=self.fs.new_many) as nm:
+            self.assertEqual(self.imported(text, "ndjson", "Review"),
+                             (25, 1))
+        self.assertEqual(nm.call_count, 3)
+        self.assertEqual(len(self.fs.find(Review, user_id="u1")), 25)
+
+    def test_errors(self):
+        """Bad rows are reported with their number."""
+        with self.assertRaisesRegex(ValueError, "row 2: row of class User"):
+            self.imported('{}\n{"__class__": "User"}\n', "ndjson")
+        with self.assertRaisesRegex(ValueError, "row 1: invalid literal"):
+            self.imported("number_rooms\nmany\n", "csv")
+        with self.assertRaisesRegex(ValueError, "row 2: not an object"):
+            self.imported('{}\n[1, 2]\n', "ndjson")
+        with self.assertRaises(ValueError):
+            self.imported("", "xml")
+
+    def test_export(self):
+        """Export writes one row per object, and CSV keeps attributes
+        outside the schema in a JSON column."""
+        pl = Place()
+        pl.number_rooms = 2
+        pl.color = "red"
+        fa = io.StringIO()
+        self.assertEqual(self.fs.export_file(Place, fa, "csv"), 1)
+        head, row = fa.getvalue().splitlines()
+        self.assertEqual(head.split(",")[:3],
+                         ["id", "created_at", "updated_at"])
+        self.assertTrue(head.endswith(",__extra__"))
+        self.assertIn('"{""color"": ""red""}"', row)
+        fa = io.StringIO()
+        self.assertEqual(self.fs.export_file(Place, fa), 1)
+        self.assertEqual(json.loads(fa.getvalue()), pl.to_dict())
+
+    def test_export_none(self):
+        """None survives a CSV export and import."""
+        pl = Place()
+        pl.number_rooms = None
+        fa = io.StringIO()
+        self.fs.export_file(Place, fa, "csv")
+        self.fs.delete(pl)
+        fa.seek(0)
+        self.fs.import_file(Place, fa, "csv")
+        self.assertIsNone(self.fs.get(Place, pl.id).number_rooms)
+
+
+if __name__ == '__main__':
+    unittest.main()
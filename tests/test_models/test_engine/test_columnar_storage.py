@@ -0,0 +1,126 @@
+#!/usr/bin/python3
+"""
+Unit tests for the ColumnarStorage class.
+"""
+from datetime import datetime
+import os
+import unittest
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.engine.columnar_storage import ColumnarStorage
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+from tests.test_models.test_engine.temp_store import TempStoreTestCase
+
+
+class test_columnarStorage(TempStoreTestCase):
+    """Tests for saving and reloading objects in columnar files."""
+
+    def setUp(self):
+        """Keep the columnar files in the temporary directory."""
+        super().setUp()
+        self.pt = os.path.join(self.dr, "cols")
+
+    def reloaded(self):
+        """Save the store, then reload it from scratch."""
+        ColumnarStorage(self.pt).save()
+        FileStorage._FileStorage__objects = {}
+        cs = ColumnarStorage(self.pt)
+        cs.reload()
+        return cs
+
+    def test_methods_existence(self):
+        """ColumnarStorage has the FileStorage interface."""
+        cs = ColumnarStorage(self.pt)
+        self.assertIsInstance(cs, FileStorage)
+        for nm in ("all", "new", "save", "reload", "count", "get"):
+            self.assertTrue(callable(getattr(cs, nm)))
+
+    def test_round_trip(self):
+        """Objects come back with the same attributes and types."""
+        pl = Place()
+        pl.name = "Loft é"
+        pl.number_rooms = 3
+        pl.latitude = 37.77
+        pl.amenity_ids = ["a", "b"]
+        rv = Review()
+        rv.place_id = pl.id
+        rv.text = ""
+        bm = BaseModel()
+        bm.extra = {"nested": [1, 2]}
+        dd = {ob.id: ob.to_dict() for ob in (pl, rv, bm)}
+        cs = self.reloaded()
+        self.assertEqual(cs.count(), 3)
+        for ob in cs.all().values():
+            self.assertEqual(ob.to_dict(), dd[ob.id])
+        self.assertIsInstance(cs.get(Place, pl.id).created_at, datetime)
+        self.assertIs(type(cs.get(Place, pl.id).latitude), float)
+
+    def test_values_outside_schema(self):
+        """Values without the schema type are kept as they are."""
+        pl = Place()
+        pl.number_rooms = "three"
+        pl.price_by_night = 2 ** 70
+        pl.city_id = "not-a-uuid"
+        p2 = Place()
+        p2.number_rooms = 2
+        cs = self.reloaded()
+        self.assertEqual(cs.get(Place, pl.id).to_dict(), pl.to_dict())
+        self.assertEqual(cs.get(Place, p2.id).to_dict(), p2.to_dict())
+
+    def test_missing_attributes(self):
+        """Attributes never set stay class defaults after reload."""
+        pl = Place()
+        cs = self.reloaded()
+        self.assertNotIn("name", cs.get(Place, pl.id).__dict__)
+        self.assertEqual(cs.get(Place, pl.id).name, "")
+
+    def test_empty_classes(self):
+        """A class without objects leaves no file behind."""
+        pl = Place()
+        ColumnarStorage(self.pt).save()
+        self.assertTrue(os.path.isfile(os.path.join(self.pt, "Place.col")))
+        FileStorage().delete(pl)
+        ColumnarStorage(self.pt).save()
+        self.assertEqual(os.listdir(self.pt), [])
+
+    def test_batch(self):
+        """Saves in a batch write the files once, when it exits."""
+        cs = ColumnarStorage(self.pt)
+        with patch.object(cs, "_ColumnarStorage__write_files",
+                          wraps=cs._ColumnarStorage__write_files) as wr:
+            with cs.batch():
+                for ii in range(20):
+                    Place()
+                    cs.save()
+                self.assertEqual(wr.call_count, 0)
+            self.assertEqual(wr.call_count, 1)
+            cs.flush()
+            self.assertEqual(wr.call_count, 1)
+        self.assertEqual(self.reloaded().count(Place), 20)
+
+    def test_unchanged_classes(self):
+        """A save rewrites only the classes whose objects changed."""
+        pl = Place()
+        rv = Review()
+        cs = self.reloaded()
+        with patch.object(cs, "_ColumnarStorage__write",
+                          wraps=cs._ColumnarStorage__write) as wr:
+            cs.save()
+            self.assertEqual(wr.call_count, 0)
+            cs.get(Place, pl.id).name = "Loft"
+            cs.save()
+            self.assertEqual([cl.args[1] for cl in wr.call_args_list],
+                             ["Place"])
+            cs.delete(cs.get(Review, rv.id))
+            cs.save()
+            self.assertEqual(wr.call_count, 1)
+        self.assertEqual(sorted(os.listdir(self.pt)), ["Place.col"])
+        cs = self.reloaded()
+        self.assertEqual(cs.get(Place, pl.id).name, "Loft")
+        self.assertEqual(cs.count(Review), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
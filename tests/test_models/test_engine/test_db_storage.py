@@ -0,0 +1,118 @@
+#!/usr/bin/python3
+"""
+Unit tests for the DBStorage class.
+"""
+from datetime import datetime
+import os
+import sqlite3
+import unittest
+from models.base_model import BaseModel
+from models.city import City
+from models.engine.db_storage import DBStorage
+from models.place import Place
+from models.state import State
+from tests.test_models.test_engine.temp_store import TempStoreTestCase
+
+
+class test_dbStorage(TempStoreTestCase):
+    """Tests for storing objects in a SQLite database."""
+
+    def setUp(self):
+        """Open a database in a temporary directory."""
+        super().setUp()
+        self.pt = os.path.join(self.dr, "file.db")
+        self.db = DBStorage(self.pt)
+        self.db.reload()
+
+    def tearDown(self):
+        """Close the database."""
+        self.db.close()
+        super().tearDown()
+
+    def reopened(self):
+        """Save and close the database, then open it again."""
+        self.db.close()
+        self.db = DBStorage(self.pt)
+        self.db.reload()
+        return self.db
+
+    def test_methods_existence(self):
+        """DBStorage has the FileStorage interface."""
+        for nm in ("all", "new", "save", "reload", "delete", "count",
+                   "get", "find", "classes", "attributes"):
+            self.assertTrue(callable(getattr(self.db, nm)))
+
+    def test_tables_and_indexes(self):
+        """Each class has a table, and *_id columns are indexed."""
+        cn = sqlite3.connect(self.pt)
+        tb = {r[0] for r in cn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        ix = {r[0] for r in cn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        cn.close()
+        self.assertEqual(tb, set(self.db.classes()))
+        self.assertIn("City_state_id", ix)
+        self.assertIn("Review_place_id", ix)
+
+    def test_round_trip(self):
+        """Saved objects come back with the same attributes and types."""
+        pl = Place()
+        pl.name = "Loft"
+        pl.number_rooms = "three"
+        pl.latitude = 1.5
+        pl.amenity_ids = ["a"]
+        pl.owner = {"n": 1}
+        dd = pl.to_dict()
+        self.db.new(pl)
+        ob = self.reopened().get(Place, pl.id)
+        self.assertIsNot(ob, pl)
+        self.assertEqual(ob.to_dict(), dd)
+        self.assertIsInstance(ob.created_at, datetime)
+        self.assertNotIn("description", ob.__dict__)
+
+    def test_save_is_a_transaction(self):
+        """Objects not saved are lost when the database is reopened."""
+        s1 = State()
+        self.db.new(s1)
+        self.db.save()
+        self.db.new(State())
+        self.assertEqual(self.db.count(State), 2)
+        self.db.reload()
+        self.assertEqual(self.db.count(State), 1)
+        self.assertIsNotNone(self.db.get("State", s1.id))
+
+    def test_batch_commits_on_exit(self):
+        """Saves inside batch() are committed when the block exits."""
+        with self.db.batch():
+            self.db.new(State())
+            self.db.save()
+            self.db.reload()
+            self.assertEqual(self.db.count(State), 0)
+            self.db.new(State())
+            self.db.save()
+        self.db.reload()
+        self.assertEqual(self.db.count(State), 1)
+
+    def test_all_count_find_delete(self):
+        """Queries see new objects, and deleted ones are gone."""
+        c1 = City()
+        c1.state_id = "s1"
+        c2 = City()
+        c2.state_id = "s2"
+        for ob in (c1, c2, BaseModel()):
+            self.db.new(ob)
+        self.assertEqual(self.db.count(), 3)
+        self.assertEqual(set(self.db.all(City)),
+                         {"City." + c1.id, "City." + c2.id})
+        self.assertIs(self.db.all()["City." + c1.id], c1)
+        self.assertEqual(list(self.db.find(City, state_id="s1")),
+                         ["City." + c1.id])
+        self.db.delete(c1)
+        self.db.save()
+        self.assertIsNone(self.reopened().get(City, c1.id))
+        self.assertEqual(self.db.count("City"), 1)
+        self.assertEqual(self.db.count("MyModel"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
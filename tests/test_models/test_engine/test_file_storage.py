@@ -6,7 +6,16 @@ from datetime import datetime
 import unittest
 from time import sleep
 import json
-from models.engine.file_storage import FileStorage
+import os
+import sys
+import threading
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.city import City
+from models.engine.file_storage import FileStorage, _entries
+from models.place import Place
+from models.user import User
+from tests.test_models.test_engine.temp_store import TempStoreTestCase
 
 
 class test_fileStorage(unittest.TestCase):
@@ -25,3 +34,565 @@ class test_fileStorage(unittest.TestCase):
 
     if __name__ == '__main__':
         unittest.main()
+
+
+class test_fileStorage_background(TempStoreTestCase):
+    """Tests for the background snapshot mode of FileStorage."""
+
+    def test_save_does_not_write(self):
+        """save() returns before anything is written."""
+        fs = FileStorage(self.pt, background=True, interval=60)
+        BaseModel()
+        fs.save()
+        self.assertFalse(os.path.isfile(self.pt))
+        fs.close()
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            self.assertEqual(len(json.load(fa)), 1)
+
+    def test_snapshot_after_max_dirty(self):
+        """The worker writes a snapshot once enough saves are pending."""
+        fs = FileStorage(self.pt, background=True, interval=60,
+                         max_dirty=3)
+        for ii in range(3):
+            BaseModel()
+            fs.save()
+        for ii in range(200):
+            if os.path.isfile(self.pt):
+                break
+            sleep(0.01)
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            self.assertEqual(len(json.load(fa)), 3)
+        self.assertFalse(os.path.isfile(self.pt + ".tmp"))
+        fs.close()
+
+    def test_snapshot_after_interval(self):
+        """The worker writes a snapshot once the interval has passed."""
+        fs = FileStorage(self.pt, background=True, interval=0.05)
+        BaseModel()
+        fs.save()
+        for ii in range(200):
+            if os.path.isfile(self.pt):
+                break
+            sleep(0.01)
+        self.assertTrue(os.path.isfile(self.pt))
+        fs.close()
+
+    def test_failed_snapshot(self):
+        """A failed snapshot is raised by the next save and retried."""
+        fs = FileStorage(self.pt, background=True, interval=0.05)
+        bb = BaseModel()
+        bb.tags = ["a"]
+        with patch("models.engine.file_storage.os.replace",
+                   side_effect=OSError("disk full")):
+            fs.save()
+            with self.assertRaises(OSError):
+                for ii in range(200):
+                    sleep(0.01)
+                    fs.save()
+        fs.save()
+        for ii in range(200):
+            if os.path.isfile(self.pt):
+                break
+            sleep(0.01)
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            self.assertEqual(json.load(fa)["BaseModel." + bb.id]["tags"],
+                             ["a"])
+        fs.close()
+
+    def test_unserializable_value(self):
+        """A value JSON cannot store is raised by save() itself."""
+        fs = FileStorage(self.pt, background=True, interval=60)
+        bb = BaseModel()
+        bb.tags = {"a"}
+        with self.assertRaises(TypeError):
+            fs.save()
+        bb.tags = ["a"]
+        fs.save()
+        fs.close()
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            self.assertEqual(json.load(fa)["BaseModel." + bb.id]["tags"],
+                             ["a"])
+
+    def test_snapshot_as_of_save(self):
+        """The snapshot holds the objects as they were at the last save,
+        whatever happened to them before it was written."""
+        fs = FileStorage(self.pt, background=True, interval=60)
+        kept = BaseModel()
+        kept.name = "saved"
+        gone = BaseModel()
+        fs.save()
+        kept.name = "changed"
+        fs.delete(gone)
+        BaseModel()
+        fs.close()
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            dd = json.load(fa)
+        self.assertEqual(dd.keys(), {"BaseModel." + kept.id,
+                                     "BaseModel." + gone.id})
+        self.assertEqual(dd["BaseModel." + kept.id]["name"], "saved")
+
+    def test_modes(self):
+        """Background mode needs the text cache."""
+        with self.assertRaises(ValueError):
+            FileStorage(self.pt, background=True, cache=False)
+
+
+class test_fileStorage_group(TempStoreTestCase):
+    """Tests for group commit and batches in FileStorage."""
+
+    def stored(self):
+        """Count the objects in the JSON file."""
+        if not os.path.isfile(self.pt):
+            return 0
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            return len(json.load(fa))
+
+    def test_group_by_count(self):
+        """Every max_dirty-th save writes the file."""
+        fs = FileStorage(self.pt, group=True, interval=60, max_dirty=3)
+        for ii in range(5):
+            BaseModel()
+            fs.save()
+        self.assertEqual(self.stored(), 3)
+        fs.close()
+        self.assertEqual(self.stored(), 5)
+
+    def test_group_by_time(self):
+        """A save after interval seconds writes the pending saves."""
+        fs = FileStorage(self.pt, group=True, interval=0.05)
+        BaseModel()
+        fs.save()
+        BaseModel()
+        fs.save()
+        self.assertEqual(self.stored(), 0)
+        sleep(0.06)
+        BaseModel()
+        fs.save()
+        self.assertEqual(self.stored(), 3)
+
+    def test_flush(self):
+        """flush() writes pending saves, and nothing when none are."""
+        fs = FileStorage(self.pt, group=True, interval=60)
+        fs.flush()
+        self.assertFalse(os.path.isfile(self.pt))
+        BaseModel()
+        fs.save()
+        fs.flush()
+        self.assertEqual(self.stored(), 1)
+
+    def test_batch(self):
+        """Saves in nested batches are written once the outer one exits."""
+        fs = FileStorage(self.pt)
+        with patch("models.engine.file_storage.json.dumps",
+                   wraps=json.dumps) as dm:
+            with fs.batch():
+                for ii in range(3):
+                    BaseModel()
+                    fs.save()
+                with fs.batch():
+                    BaseModel()
+                    fs.save()
+                self.assertEqual(dm.call_count, 0)
+                self.assertEqual(self.stored(), 0)
+        self.assertEqual(self.stored(), 4)
+        BaseModel()
+        fs.save()
+        self.assertEqual(self.stored(), 5)
+
+    def test_batch_background(self):
+        """The background writer waits for batches to exit."""
+        fs = FileStorage(self.pt, background=True, interval=0.01)
+        with fs.batch():
+            BaseModel()
+            fs.save()
+            sleep(0.05)
+            self.assertEqual(self.stored(), 0)
+        self.assertEqual(self.stored(), 1)
+        fs.close()
+
+    def test_group_and_background(self):
+        """Group and background modes cannot be combined."""
+        with self.assertRaises(ValueError):
+            FileStorage(self.pt, group=True, background=True)
+
+
+class test_fileStorage_atomic(TempStoreTestCase):
+    """Tests for atomic saves and the fsync policy of FileStorage."""
+
+    def test_failed_save_keeps_file(self):
+        """A save that fails midway leaves the previous file intact."""
+        fs = FileStorage(self.pt)
+        BaseModel()
+        fs.save()
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            before = fa.read()
+        bm = BaseModel()
+        with patch.object(bm, "to_dict", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                fs.save()
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            self.assertEqual(fa.read(), before)
+        self.assertEqual(os.listdir(self.dr), ["file.json"])
+
+    def test_failed_save_keeps_changes(self):
+        """Objects changed before a failed save are written by the next
+        one."""
+        fs = FileStorage(self.pt)
+        pl = Place()
+        fs.save()
+        pl.name = "Loft"
+        with patch("models.engine.file_storage.os.replace",
+                   side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                fs.save()
+        fs.save()
+        FileStorage._FileStorage__objects = {}
+        fs = FileStorage(self.pt)
+        fs.reload()
+        self.assertEqual(fs.get(Place, pl.id).name, "Loft")
+
+    def test_fsync_policies(self):
+        """Each policy syncs the files, and the directory, it names."""
+        for policy, calls in (("none", 0), ("file", 1), ("dir", 2)):
+            fs = FileStorage(self.pt, fsync=policy)
+            BaseModel()
+            with patch("models.engine.file_storage.os.fsync") as fy:
+                fs.save()
+            self.assertEqual(fy.call_count, calls)
+
+    def test_bad_policy(self):
+        """An unknown fsync policy is rejected."""
+        with self.assertRaises(ValueError):
+            FileStorage(self.pt, fsync="always")
+
+
+class test_fileStorage_stream(TempStoreTestCase):
+    """Tests for reading the JSON file a chunk at a time."""
+
+    def entries(self, tx, size):
+        """Write tx to the file and parse it back size bytes at a time."""
+        with open(self.pt, "w", encoding="utf-8") as fa:
+            fa.write(tx)
+        with open(self.pt, "rb") as fa:
+            ens = list(_entries(fa, size))
+        for k, v, t in ens:
+            self.assertEqual(json.loads(t), v)
+        return {k: v for k, v, t in ens}
+
+    def test_chunk_boundaries(self):
+        """Entries split across chunks are parsed whatever the layout."""
+        dd = {"a.1": {"n": "caf\u00e9 \u2603", "x": [1, 2.5, None]},
+              "b\"2": {"y": {"z": "}"}}, "c.3": 12345, "d.4": "s,}"}
+        for tx in (json.dumps(dd), json.dumps(dd, indent=4),
+                   json.dumps(dd, ensure_ascii=False)):
+            for size in (1, 2, 3, 7, 1 << 20):
+                self.assertEqual(self.entries(tx, size), dd)
+        self.assertEqual(self.entries(" { } ", 1), {})
+
+    def test_bad_file(self):
+        """A file that is not a whole JSON object is rejected."""
+        for tx in ("", "[]", '{"a": 1', '{"a": 1 "b": 2}'):
+            with self.assertRaises(ValueError):
+                self.entries(tx, 2)
+
+    def test_reload_progress(self):
+        """reload() reports the bytes read until the whole file is."""
+        for ii in range(100):
+            BaseModel()
+        FileStorage(self.pt).save()
+        FileStorage._FileStorage__objects = {}
+        seen = []
+        fs = FileStorage(self.pt, progress=lambda d, t: seen.append((d, t)))
+        with patch("models.engine.file_storage._entries.__defaults__",
+                   (1000, None)):
+            fs.reload()
+        self.assertEqual(fs.count(), 100)
+        size = os.path.getsize(self.pt)
+        self.assertGreater(len(seen), 5)
+        self.assertEqual(seen[-1], (size, size))
+
+
+class test_fileStorage_parallel(TempStoreTestCase):
+    """Tests for reloading the JSON file in worker processes."""
+
+    def setUp(self):
+        """Write a file of a few MB in a temporary directory."""
+        super().setUp()
+        for ii in range(2500):
+            pl = Place()
+            pl.name = "caf\u00e9 }}, \"Place.{}\": {{".format(ii)
+            pl.description = "x" * 1000
+            pl.amenity_ids = ["a", "b"]
+        FileStorage(self.pt).save()
+        FileStorage(self.pt).reload()
+        self.expected = {k: str(v) for k, v in
+                         FileStorage._FileStorage__objects.items()}
+        FileStorage._FileStorage__objects = {}
+
+    def test_parallel_reload(self):
+        """Workers build the same objects as a plain reload."""
+        fs = FileStorage(self.pt, workers=2)
+        with patch.object(FileStorage, "_read",
+                          side_effect=AssertionError):
+            fs.reload()
+        self.assertEqual({k: str(v) for k, v in fs.all().items()},
+                         self.expected)
+
+    def test_false_boundary(self):
+        """Keys that look like entries inside objects fall back to a
+        plain reload."""
+        fs = FileStorage(self.pt)
+        fs.reload()
+        for ob in list(fs.all().values()):
+            ob.nested = {"a": {}, "Place.{}".format(ob.id): {"b": 1}}
+        fs.save()
+        fs.reload()
+        self.expected = {k: str(v) for k, v in fs.all().items()}
+        FileStorage._FileStorage__objects = {}
+        fs = FileStorage(self.pt, workers=2)
+        fs.reload()
+        self.assertEqual({k: str(v) for k, v in fs.all().items()},
+                         self.expected)
+
+
+class test_fileStorage_by_class(unittest.TestCase):
+    """Tests for the per-class lookups of FileStorage."""
+
+    def setUp(self):
+        """Start from an empty store."""
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Reset the store."""
+        FileStorage._FileStorage__objects = {}
+
+    def test_all_and_count_by_class(self):
+        """all(cls) and count(cls) only see objects of cls."""
+        fs = FileStorage()
+        pp = [Place() for ii in range(5)]
+        uu = User()
+        self.assertEqual(fs.count(), 6)
+        self.assertEqual(fs.count(Place), 5)
+        self.assertEqual(fs.count("User"), 1)
+        self.assertEqual(fs.count("Review"), 0)
+        self.assertEqual(set(fs.all(Place).values()), set(pp))
+        self.assertEqual(fs.all("User"), {"User." + uu.id: uu})
+
+    def test_delete(self):
+        """delete() removes an object from all() and all(cls)."""
+        fs = FileStorage()
+        pl = Place()
+        Place()
+        fs.delete(pl)
+        fs.delete(None)
+        self.assertNotIn("Place." + pl.id, fs.all())
+        self.assertNotIn("Place." + pl.id, fs.all(Place))
+        self.assertEqual(fs.count(Place), 1)
+
+    def test_replaced_objects(self):
+        """The index follows __objects being replaced or changed."""
+        fs = FileStorage()
+        Place()
+        self.assertEqual(fs.count(Place), 1)
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual(fs.count(Place), 0)
+        pl = Place()
+        del fs.all()["Place." + pl.id]
+        self.assertEqual(fs.count(Place), 0)
+
+
+class test_fileStorage_find(unittest.TestCase):
+    """Tests for the attribute lookups of FileStorage."""
+
+    def setUp(self):
+        """Start from an empty store."""
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """Reset the store and its file."""
+        FileStorage._FileStorage__objects = {}
+        if os.path.isfile(FileStorage._FileStorage__file_path):
+            os.remove(FileStorage._FileStorage__file_path)
+
+    def test_find_indexed(self):
+        """find() returns the objects with the given indexed value."""
+        fs = FileStorage()
+        c1 = City()
+        c1.state_id = "s1"
+        c1.save()
+        c2 = City()
+        c2.state_id = "s2"
+        c2.save()
+        self.assertEqual(fs.find(City, state_id="s1"),
+                         {"City." + c1.id: c1})
+        self.assertEqual(fs.find("City", state_id="s3"), {})
+
+    def test_find_after_update_and_delete(self):
+        """The index follows saved changes and deletions."""
+        fs = FileStorage()
+        c1 = City()
+        c1.state_id = "s1"
+        c1.save()
+        c1.state_id = "s2"
+        c1.save()
+        self.assertEqual(fs.find(City, state_id="s1"), {})
+        self.assertEqual(list(fs.find(City, state_id="s2")),
+                         ["City." + c1.id])
+        fs.delete(c1)
+        self.assertEqual(fs.find(City, state_id="s2"), {})
+
+    def test_find_not_indexed(self):
+        """Attributes without an index are matched by scanning."""
+        fs = FileStorage()
+        pl = Place()
+        pl.name = "Loft"
+        pl.city_id = "c1"
+        pl.save()
+        Place().save()
+        self.assertEqual(list(fs.find(Place, name="Loft")),
+                         ["Place." + pl.id])
+        self.assertEqual(list(fs.find(Place, city_id="c1", name="Loft")),
+                         ["Place." + pl.id])
+        self.assertEqual(fs.find(Place, city_id="c1", name="Hut"), {})
+
+
+class test_fileStorage_dirty(TempStoreTestCase):
+    """Tests for saving only the objects that changed."""
+
+    def saved(self, fs):
+        """Save fs, counting the objects serialized."""
+        with patch.object(BaseModel, "to_dict", autospec=True,
+                          side_effect=BaseModel.to_dict) as td:
+            fs.save()
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            self.assertEqual(json.load(fa),
+                             {k: v.to_dict() for k, v in fs.all().items()})
+        return td.call_count
+
+    def test_only_changed_objects_serialized(self):
+        """Objects untouched since the last save are not serialized."""
+        fs = FileStorage(self.pt)
+        bb = [BaseModel() for ii in range(10)]
+        self.assertEqual(self.saved(fs), 10)
+        self.assertEqual(self.saved(fs), 0)
+        bb[3].name = "Betty"
+        self.assertEqual(self.saved(fs), 1)
+        bb[4].updated_at = datetime.now()
+        fs.new(bb[4])
+        self.assertEqual(self.saved(fs), 1)
+        bb[5].__dict__["name"] = "Holberton"
+        fs.new(bb[5])
+        BaseModel()
+        fs.delete(bb[6])
+        self.assertEqual(self.saved(fs), 2)
+
+    def test_replaced_objects_serialized(self):
+        """Objects replaced behind storage's back are serialized."""
+        fs = FileStorage(self.pt)
+        bb = BaseModel()
+        self.assertEqual(self.saved(fs), 1)
+        b2 = BaseModel(**bb.to_dict())
+        b2.__dict__["name"] = "Betty"
+        fs.all()["BaseModel." + bb.id] = b2
+        self.assertEqual(self.saved(fs), 1)
+
+    def test_reloaded_objects_not_serialized(self):
+        """Objects read by reload() keep their text from the file."""
+        fs = FileStorage(self.pt)
+        for ii in range(10):
+            BaseModel()
+        fs.save()
+        fs.reload()
+        self.assertEqual(self.saved(fs), 0)
+        next(iter(fs.all().values())).name = "Betty"
+        self.assertEqual(self.saved(fs), 1)
+
+    def test_without_cache(self):
+        """Without the cache every save serializes every object, and no
+        text is kept."""
+        fs = FileStorage(self.pt, cache=False)
+        for ii in range(10):
+            BaseModel()
+        self.assertEqual(self.saved(fs), 10)
+        self.assertEqual(self.saved(fs), 10)
+        self.assertEqual(FileStorage._FileStorage__texts, {})
+
+
+class test_fileStorage_threadsafe(TempStoreTestCase):
+    """Tests for FileStorage shared by many threads."""
+
+    def setUp(self):
+        """Use a threadsafe store as the storage singleton."""
+        super().setUp()
+        self.fs = FileStorage(self.pt, threadsafe=True)
+        self.patch = patch("models.base_model.storage", self.fs)
+        self.patch.start()
+        self.interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)
+
+    def tearDown(self):
+        """Restore the switch interval and the storage singleton."""
+        sys.setswitchinterval(self.interval)
+        self.patch.stop()
+        super().tearDown()
+
+    def run_threads(self, *targets):
+        """Run each target in its own thread and re-raise any error."""
+        errors = []
+
+        def run(tg):
+            try:
+                tg()
+            except Exception as ee:
+                errors.append(ee)
+        ths = [threading.Thread(target=run, args=(tg,)) for tg in targets]
+        for th in ths:
+            th.start()
+        for th in ths:
+            th.join()
+        if errors:
+            raise errors[0]
+
+    def test_all_is_a_copy(self):
+        """all() returns a copy that new objects do not change."""
+        BaseModel()
+        obs = self.fs.all()
+        BaseModel()
+        self.assertEqual(len(obs), 1)
+        self.assertEqual(self.fs.count(), 2)
+
+    def test_stress(self):
+        """Threads creating, updating, deleting, listing and saving
+        objects at once leave a consistent store."""
+        kept = []
+
+        def writer():
+            for ii in range(200):
+                pl = Place()
+                pl.city_id = str(ii % 5)
+                pl.save()
+                if ii % 2:
+                    self.fs.delete(pl)
+                else:
+                    kept.append(pl)
+
+        def reader():
+            for ii in range(200):
+                for ob in self.fs.all().values():
+                    ob.to_dict()
+                self.fs.find(Place, city_id="1")
+                self.fs.count(Place)
+
+        self.run_threads(*[writer] * 4 + [reader] * 4)
+        self.fs.save()
+        self.assertEqual(self.fs.count(Place), len(kept))
+        self.assertEqual(len(self.fs.find(Place, city_id="0")),
+                         sum(1 for pl in kept if pl.city_id == "0"))
+        FileStorage._FileStorage__objects = {}
+        self.fs.reload()
+        self.assertEqual(sorted(self.fs.all()),
+                         sorted("Place." + pl.id for pl in kept))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+#!/usr/bin/python3
+"""
+Unit tests for the JournalStorage class.
+"""
+import json
+import os
+import unittest
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+from models.engine.journal_storage import JournalStorage
+from models.place import Place
+from tests.test_models.test_engine.temp_store import TempStoreTestCase
+
+
+class test_journalStorage(TempStoreTestCase):
+    """Tests for the append-only journal of JournalStorage."""
+
+    def records(self):
+        """Read the records currently in the journal."""
+        with open(self.pt + ".log", "r", encoding="utf-8") as fa:
+            return [json.loads(ln) for ln in fa]
+
+    def test_update_appends_changed_fields(self):
+        """Only the changed fields of an object are journaled."""
+        fs = JournalStorage(self.pt)
+        bb = BaseModel()
+        fs.save()
+        bb.name = "Betty"
+        fs.save()
+        rc = self.records()[-1]
+        self.assertEqual(rc["op"], "update")
+        self.assertEqual(rc["set"], {"name": "Betty"})
+        self.assertEqual(rc["unset"], [])
+
+    def test_reload_replays_journal(self):
+        """reload() rebuilds creates, updates and deletes from the log."""
+        fs = JournalStorage(self.pt)
+        b1 = BaseModel()
+        b2 = BaseModel()
+        for ii in range(20):
+            BaseModel()
+        fs.save()
+        b1.name = "Holberton"
+        del fs.all()["BaseModel." + b2.id]
+        fs.save()
+        self.assertEqual([rc["op"] for rc in self.records()],
+                         ["update", "delete"])
+        FileStorage._FileStorage__objects = {}
+        JournalStorage(self.pt).reload()
+        ob = FileStorage().all()
+        self.assertEqual(len(ob), 21)
+        self.assertEqual(ob["BaseModel." + b1.id].name, "Holberton")
+        self.assertNotIn("BaseModel." + b2.id, ob)
+
+    def test_torn_record_is_ignored(self):
+        """A partially written last record does not break reload()."""
+        fs = JournalStorage(self.pt)
+        for ii in range(20):
+            BaseModel()
+        fs.save()
+        with open(self.pt + ".log", "a", encoding="utf-8") as fa:
+            fa.write('{"op": "delete", "ke')
+        FileStorage._FileStorage__objects = {}
+        JournalStorage(self.pt).reload()
+        self.assertEqual(len(FileStorage().all()), 20)
+
+    def test_compact(self):
+        """compact() folds the journal into the snapshot."""
+        fs = JournalStorage(self.pt)
+        bb = BaseModel()
+        fs.save()
+        bb.name = "Betty"
+        fs.save()
+        fs.compact()
+        self.assertEqual(os.path.getsize(self.pt + ".log"), 0)
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            dd = json.load(fa)
+        self.assertEqual(dd["BaseModel." + bb.id]["name"], "Betty")
+
+    def test_only_changed_objects(self):
+        """The journal only serializes objects that changed."""
+        fs = JournalStorage(self.pt)
+        bb = [BaseModel() for ii in range(10)]
+        fs.save()
+        bb[0].name = "Betty"
+        with patch.object(BaseModel, "to_dict", autospec=True,
+                          side_effect=BaseModel.to_dict) as td:
+            fs.save()
+        self.assertEqual(td.call_count, 1)
+
+    def test_failed_append_keeps_changes(self):
+        """Objects changed before a failed append are logged by the next
+        one."""
+        fs = JournalStorage(self.pt)
+        pl = Place()
+        fs.save()
+        pl.name = "Loft"
+        with patch("models.engine.journal_storage.open", create=True,
+                   side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                fs.save()
+        fs.save()
+        FileStorage._FileStorage__objects = {}
+        fs = JournalStorage(self.pt)
+        fs.reload()
+        self.assertEqual(fs.get(Place, pl.id).name, "Loft")
+
+    def test_fsync(self):
+        """Journal appends are synced under the file policy."""
+        fs = JournalStorage(self.pt, fsync="file")
+        for ii in range(5):
+            BaseModel()
+        fs.save()
+        BaseModel()
+        with patch("models.engine.file_storage.os.fsync") as fy:
+            fs.save()
+        self.assertEqual(fy.call_count, 1)
+
+    def test_modes(self):
+        """The journal cannot write in the background or without the
+        text cache."""
+        for kw in ({"background": True}, {"cache": False}):
+            with self.assertRaises(ValueError):
+                JournalStorage(self.pt, **kw)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""
+Unit tests for the LazyStorage class.
+"""
+import json
+import unittest
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.engine.lazy_storage import LazyStorage
+from models.place import Place
+from tests.test_models.test_engine.temp_store import TempStoreTestCase
+
+
+class test_lazyStorage(TempStoreTestCase):
+    """Tests for building objects only when LazyStorage reaches them."""
+
+    def setUp(self):
+        """Save a few objects to a temporary file."""
+        super().setUp()
+        self.cc = [City() for ii in range(3)]
+        self.cc[0].state_id = "s1"
+        self.pp = [Place() for ii in range(4)]
+        FileStorage(self.pt).save()
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            self.tx = fa.read()
+        FileStorage._FileStorage__objects = {}
+        self.fs = LazyStorage(self.pt)
+        self.fs.reload()
+
+    def test_reload_builds_nothing(self):
+        """reload() only records the objects."""
+        self.assertEqual(FileStorage._FileStorage__objects, {})
+        self.assertEqual(self.fs.count(), 7)
+        self.assertEqual(self.fs.count(Place), 4)
+
+    def test_get(self):
+        """get() builds only the object asked for."""
+        cc = self.fs.get("City", self.cc[1].id)
+        self.assertEqual(cc.to_dict(), self.cc[1].to_dict())
+        self.assertEqual(len(FileStorage._FileStorage__objects), 1)
+        self.assertIsNone(self.fs.get("City", "nope"))
+        self.assertEqual(self.fs.count(), 7)
+
+    def test_all_and_find(self):
+        """all(cls) and find() build one class, all() builds the rest."""
+        self.assertEqual(list(self.fs.find(City, state_id="s1")),
+                         ["City." + self.cc[0].id])
+        self.assertEqual(len(self.fs.all(City)), 3)
+        self.assertEqual(len(FileStorage._FileStorage__objects), 3)
+        self.assertEqual(len(self.fs.all()), 7)
+        self.assertEqual(self.fs.count(), 7)
+
+    def test_save_keeps_unloaded(self):
+        """save() writes the objects not built yet unchanged."""
+        self.fs.save()
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            self.assertEqual(json.loads(fa.read()), json.loads(self.tx))
+        pl = self.fs.get(Place, self.pp[0].id)
+        pl.name = "Loft"
+        self.fs.save()
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            dd = json.load(fa)
+        self.assertEqual(len(dd), 7)
+        self.assertEqual(dd["Place." + pl.id]["name"], "Loft")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+"""
+Unit tests for the Query class.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+from models.engine.db_storage import DBStorage
+from models.engine.file_storage import FileStorage
+from models.engine.query import Query
+from models.place import Place
+
+
+class test_query(unittest.TestCase):
+    """Tests for queries over a FileStorage."""
+
+    def setUp(self):
+        """Store a few places."""
+        FileStorage._FileStorage__objects = {}
+        self.fs = FileStorage()
+        self.pls = []
+        for ii in range(10):
+            pl = Place()
+            pl.price_by_night = 50 * (ii % 5)
+            pl.number_rooms = ii
+            pl.city_id = "c{}".format(ii % 2)
+            self.pls.append(pl)
+
+    def tearDown(self):
+        """Reset the store."""
+        FileStorage._FileStorage__objects = {}
+
+    def test_where(self):
+        """Conditions combine equality and comparisons."""
+        qr = self.fs.query(Place)
+        self.assertIsInstance(qr, Query)
+        self.assertEqual(list(qr), self.pls)
+        self.assertEqual(list(qr.where("price_by_night", "<", 100)),
+                         [pl for pl in self.pls if pl.price_by_night < 100])
+        self.assertEqual(
+            list(qr.where("number_rooms", ">=", 4).where(city_id="c1")),
+            self.pls[5::2])
+        self.assertEqual(list(qr.where("name", "!=", "")), [])
+        self.assertEqual(list(qr.where("city_id", "<", 3)), [])
+        with self.assertRaises(ValueError):
+            qr.where("name", "~", "a")
+
+    def test_equality_uses_index(self):
+        """Equality conditions go through find()."""
+        with patch.object(self.fs, "find", wraps=self.fs.find) as fd:
+            obs = list(self.fs.query("Place").where("city_id", "==", "c0")
+                       .where("number_rooms", "<", 5))
+        fd.assert_called_once_with("Place", city_id="c0")
+        self.assertEqual(obs, self.pls[0:5:2])
+
+    def test_order_and_pages(self):
+        """Objects are sorted, skipped and limited."""
+        qr = self.fs.query(Place).order_by("-price_by_night", "number_rooms")
+        obs = list(qr)
+        self.assertEqual([pl.number_rooms for pl in obs],
+                         [4, 9, 3, 8, 2, 7, 1, 6, 0, 5])
+        self.assertEqual(list(qr.offset(2).limit(3)), obs[2:5])
+        self.assertEqual(list(qr.after(obs[3]).limit(2)), obs[4:6])
+        self.assertEqual(list(qr.after("Place." + obs[8].id)), obs[9:])
+        self.assertEqual(qr.first(), obs[0])
+        self.assertEqual(qr.where("price_by_night", ">", 100).count(), 4)
+
+    def test_missing_attributes_last(self):
+        """Objects without the attribute sort last either way."""
+        self.pls[0].__dict__["rank"] = 2
+        self.pls[1].__dict__["rank"] = 1
+        qr = self.fs.query(Place)
+        self.assertEqual(list(qr.order_by("rank"))[:2],
+                         [self.pls[1], self.pls[0]])
+        self.assertEqual(list(qr.order_by("-rank"))[:2],
+                         [self.pls[0], self.pls[1]])
+
+    def test_mixed_types(self):
+        """Values of different types sort by type instead of failing."""
+        for pl, v in zip(self.pls, [1, "2", 0.5, None, "a"]):
+            pl.__dict__["rank"] = v
+        qr = self.fs.query(Place)
+        ranks = [getattr(pl, "rank", None) for pl in qr.order_by("rank")]
+        self.assertEqual(ranks[:5], [0.5, 1, "2", "a", None])
+        ranks = [getattr(pl, "rank", None) for pl in qr.order_by("-rank")]
+        self.assertEqual(ranks[:5], ["a", "2", 1, 0.5, None])
+        self.pls[5].__dict__["rank"] = {"b": 1}
+        self.pls[6].__dict__["rank"] = {"a": 2}
+        ranks = [getattr(pl, "rank", None) for pl in qr.order_by("rank")]
+        self.assertEqual(ranks[:7], [0.5, 1, {"a": 2}, {"b": 1}, "2", "a",
+                                     None])
+
+    def test_lazy(self):
+        """Without order_by, nothing is checked past the limit."""
+        with patch("models.engine.query.Query._Query__match",
+                   autospec=True, return_value=True) as mt:
+            obs = list(self.fs.query(Place).where("number_rooms", ">", 0)
+                       .limit(3))
+        self.assertEqual(len(obs), 3)
+        self.assertEqual(mt.call_count, 3)
+
+
+class test_query_db(unittest.TestCase):
+    """Tests for queries over a DBStorage."""
+
+    def test_where(self):
+        """A DBStorage query filters rows in SQL and objects in Python."""
+        dr = tempfile.mkdtemp()
+        db = DBStorage(os.path.join(dr, "file.db"))
+        try:
+            db.reload()
+            for ii in range(4):
+                pl = Place()
+                pl.city_id = "c{}".format(ii % 2)
+                pl.max_guest = ii
+                db.new(pl)
+            db.save()
+            obs = list(db.query(Place).where(city_id="c1")
+                       .where("max_guest", ">", 1))
+            self.assertEqual([pl.max_guest for pl in obs], [3])
+        finally:
+            db.close()
+            FileStorage._FileStorage__objects = {}
+            shutil.rmtree(dr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/python3
+"""
+Unit tests for the ShardedStorage class.
+"""
+import os
+import unittest
+from time import sleep
+from unittest.mock import patch
+from models.city import City
+from models.engine.file_storage import FileStorage
+from models.engine.sharded_storage import ShardedStorage
+from models.place import Place
+from models.user import User
+from tests.test_models.test_engine.temp_store import TempStoreTestCase
+
+
+class test_shardedStorage(TempStoreTestCase):
+    """Tests for the sharded layout of ShardedStorage."""
+
+    def setUp(self):
+        """Also name the shard directory."""
+        super().setUp()
+        self.sd = os.path.join(self.dr, "file.shards")
+
+    def files(self):
+        """Get the modification stamps of the shard files."""
+        return {fn: os.stat(os.path.join(self.sd, fn)).st_mtime_ns
+                for fn in os.listdir(self.sd)}
+
+    def reopened(self, shards, names=None):
+        """Get a new sharded storage reloaded from the directory."""
+        FileStorage._FileStorage__objects = {}
+        fs = ShardedStorage(self.pt, shards=shards)
+        fs.reload(names)
+        return fs
+
+    def test_one_file_per_class(self):
+        """Each class goes to its own file, and reload reads them all."""
+        fs = ShardedStorage(self.pt)
+        us = User()
+        ct = City()
+        fs.save()
+        self.assertEqual(sorted(os.listdir(self.sd)),
+                         ["City.json", "User.json"])
+        self.assertFalse(os.path.isfile(self.pt))
+        fs = self.reopened({})
+        self.assertEqual(fs.count(), 2)
+        self.assertEqual(fs.get(User, us.id).to_dict(), us.to_dict())
+        self.assertEqual(fs.get("City", ct.id).to_dict(), ct.to_dict())
+
+    def test_only_dirty_shards_rewritten(self):
+        """save() leaves the files of unchanged classes alone."""
+        fs = ShardedStorage(self.pt, shards={"Place": 4})
+        us = User()
+        pls = [Place() for ii in range(40)]
+        fs.save()
+        self.assertEqual(len(os.listdir(self.sd)), 5)
+        before = self.files()
+        sleep(0.01)
+        pls[0].name = "Loft"
+        fs.save()
+        after = self.files()
+        changed = [fn for fn in after if after[fn] != before[fn]]
+        self.assertEqual(len(changed), 1)
+        self.assertTrue(changed[0].startswith("Place."))
+        sleep(0.01)
+        fs.delete(us)
+        fs.save()
+        del after["User.json"]
+        self.assertEqual(self.files(), after)
+        fs = self.reopened({"Place": 4})
+        self.assertEqual(fs.count(), 40)
+        self.assertEqual(fs.get(Place, pls[0].id).name, "Loft")
+
+    def test_reload_subset(self):
+        """Classes left out of reload() are read when first used."""
+        fs = ShardedStorage(self.pt)
+        us = User()
+        ct = City()
+        fs.save()
+        fs = self.reopened({}, ["City"])
+        self.assertEqual(len(FileStorage._FileStorage__objects), 1)
+        self.assertEqual(fs.count(City), 1)
+        u2 = User()
+        self.assertEqual(fs.count(User), 2)
+        fs.save()
+        fs = self.reopened({})
+        self.assertIsNotNone(fs.get(User, us.id))
+        self.assertIsNotNone(fs.get(User, u2.id))
+        self.assertIsNotNone(fs.get(City, ct.id))
+
+    def test_layout_change(self):
+        """Files of an old layout are replaced on the next save."""
+        fs = ShardedStorage(self.pt)
+        for ii in range(20):
+            Place()
+        fs.save()
+        fs = self.reopened({"Place": 3})
+        fs.save()
+        self.assertEqual(sorted(os.listdir(self.sd)),
+                         ["Place.0.json", "Place.1.json", "Place.2.json"])
+        fs = self.reopened({})
+        fs.compact()
+        self.assertEqual(os.listdir(self.sd), ["Place.json"])
+        self.assertEqual(self.reopened({}).count(Place), 20)
+
+    def test_failed_save_keeps_changes(self):
+        """Objects changed before a failed save are written by the next
+        one."""
+        fs = ShardedStorage(self.pt)
+        pl = Place()
+        fs.save()
+        pl.name = "Loft"
+        with patch("models.engine.file_storage.os.replace",
+                   side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                fs.save()
+        fs.save()
+        self.assertEqual(self.reopened({}).get(Place, pl.id).name, "Loft")
+
+    def test_modes(self):
+        """Shards cannot be written in the background."""
+        with self.assertRaises(ValueError):
+            ShardedStorage(self.pt, background=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""
+Unit tests for the SharedStorage class.
+"""
+import json
+import multiprocessing
+import unittest
+from models.base_model import BaseModel
+from models.engine.file_storage import FileStorage
+from models.engine.shared_storage import SharedStorage
+from tests.test_models.test_engine.temp_store import TempStoreTestCase
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(),
+                     "needs fork")
+class test_sharedStorage(TempStoreTestCase):
+    """Tests for a JSON file shared by several processes."""
+
+    def opened(self):
+        """Get a new shared storage reloaded from the file."""
+        FileStorage._FileStorage__objects = {}
+        fs = SharedStorage(self.pt)
+        fs.reload()
+        return fs
+
+    def in_process(self, *targets):
+        """Run each target in its own process on a fresh storage."""
+        ctx = multiprocessing.get_context("fork")
+        pcs = [ctx.Process(target=lambda tg=tg: tg(self.opened()))
+               for tg in targets]
+        for pc in pcs:
+            pc.start()
+        for pc in pcs:
+            pc.join()
+            self.assertEqual(pc.exitcode, 0)
+
+    def saved(self):
+        """Get the keys in the JSON file."""
+        with open(self.pt, "r", encoding="utf-8") as fa:
+            return json.load(fa)
+
+    def test_saves_merge(self):
+        """A save keeps the objects another process saved meanwhile."""
+        fs = self.opened()
+        aa = BaseModel()
+        fs.save()
+
+        def other(fs):
+            BaseModel().save()
+            fs.get(BaseModel, aa.id).name = "Other"
+            fs.save()
+        self.in_process(other)
+        cc = BaseModel()
+        fs.save()
+        dd = self.saved()
+        self.assertEqual(len(dd), 3)
+        self.assertIn("BaseModel." + cc.id, dd)
+        self.assertEqual(dd["BaseModel." + aa.id]["name"], "Other")
+        self.assertEqual(fs.count(), 3)
+        self.assertEqual(fs.get(BaseModel, aa.id).name, "Other")
+
+    def test_refresh(self):
+        """refresh() takes in the objects others changed or removed."""
+        fs = self.opened()
+        aa = BaseModel()
+        bb = BaseModel()
+        fs.save()
+        self.assertEqual(fs.refresh(), 0)
+
+        def other(fs):
+            fs.get(BaseModel, aa.id).name = "Other"
+            fs.delete(fs.get(BaseModel, bb.id))
+            fs.save()
+        self.in_process(other)
+        self.assertEqual(fs.refresh(), 2)
+        self.assertEqual(fs.get(BaseModel, aa.id).name, "Other")
+        self.assertIsNone(fs.get(BaseModel, bb.id))
+
+    def test_conflict_keeps_own_change(self):
+        """An object changed on both sides keeps the change of the
+        process that saves, while other changes are merged."""
+        fs = self.opened()
+        aa = BaseModel()
+        bb = BaseModel()
+        fs.save()
+
+        def other(fs):
+            fs.get(BaseModel, aa.id).name = "Other"
+            fs.get(BaseModel, bb.id).name = "Other"
+            fs.save()
+        self.in_process(other)
+        aa.name = "Mine"
+        fs.save()
+        dd = self.saved()
+        self.assertEqual(dd["BaseModel." + aa.id]["name"], "Mine")
+        self.assertEqual(dd["BaseModel." + bb.id]["name"], "Other")
+
+    def test_many_workers(self):
+        """Workers saving at the same time lose no object."""
+        def worker(fs):
+            for ii in range(20):
+                BaseModel()
+                fs.save()
+        self.in_process(*[worker] * 4)
+        self.assertEqual(len(self.saved()), 80)
+
+    def test_modes(self):
+        """Shared storage reads and writes the file in the calling
+        process, with the text cache."""
+        for kw in ({"background": True}, {"cache": False},
+                   {"workers": 2}):
+            with self.assertRaises(ValueError):
+                SharedStorage(self.pt, **kw)
+
+
+if __name__ == '__main__':
+    unittest.main()